@@ -2,6 +2,9 @@ import streamlit as st
 import random
 from PIL import Image
 import base64
+from rps_engine import (
+    COUNTERS, MOVES, RESULTS, determine_winner, new_markov_model, predict_move, update_markov_model
+)
 
 # Page configuration
 st.set_page_config(
@@ -11,6 +14,12 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
+OPPONENTS = ["🎲 Random", "🧠 Adaptive"]
+DEFAULT_MARKOV_ORDER = 2
+RECENT_GAMES = 10
+# Win rate over time is kept as at most this many evenly spaced points
+WIN_RATE_POINTS = 200
+
 # Custom CSS for styling
 def local_css():
     st.markdown("""
@@ -145,18 +154,13 @@ def init_session_state():
     if 'player_choice' not in st.session_state:
         st.session_state.player_choice = ""
     if 'game_history' not in st.session_state:
-        st.session_state.game_history = []
-
-# Determine the winner
-def determine_winner(player, computer):
-    if player == computer:
-        return "tie"
-    elif (player == "rock" and computer == "scissors") or \
-         (player == "paper" and computer == "rock") or \
-         (player == "scissors" and computer == "paper"):
-        return "player"
-    else:
-        return "computer"
+        st.session_state.game_history = new_ring(RECENT_GAMES)
+    if 'lifetime' not in st.session_state:
+        st.session_state.lifetime = new_lifetime()
+    if 'opponent' not in st.session_state:
+        st.session_state.opponent = OPPONENTS[0]
+    if 'markov' not in st.session_state:
+        st.session_state.markov = new_markov_model(DEFAULT_MARKOV_ORDER)
 
 # Get emoji for choice
 def get_emoji(choice):
@@ -167,6 +171,65 @@ def get_emoji(choice):
     }
     return emojis.get(choice, "❓")
 
+# Adaptive opponent: counter the move the Markov model predicts
+def computer_move():
+    if st.session_state.opponent == OPPONENTS[1]:
+        predicted = predict_move(st.session_state.markov)
+        if predicted is not None:
+            return COUNTERS[predicted]
+    return random.choice(MOVES)
+
+# Recent games: a fixed-size ring buffer, overwritten in place
+def new_ring(size):
+    return {"items": [None] * size, "next": 0, "count": 0}
+
+def ring_append(ring, item):
+    ring["items"][ring["next"]] = item
+    ring["next"] = (ring["next"] + 1) % len(ring["items"])
+    ring["count"] += 1
+
+def ring_newest_first(ring):
+    size = len(ring["items"])
+    for i in range(min(ring["count"], size)):
+        yield ring["items"][(ring["next"] - 1 - i) % size]
+
+# Lifetime stats: a move x outcome matrix, streaks and a win-rate series,
+# all updated in O(1) per round. The series doubles its spacing whenever it
+# fills up, so it never holds more than WIN_RATE_POINTS points.
+def new_lifetime():
+    return {
+        "rounds": 0,
+        "wins": 0,
+        "outcomes": [[0, 0, 0] for _ in MOVES],
+        "streak_result": "",
+        "streak": 0,
+        "best_win_streak": 0,
+        "best_loss_streak": 0,
+        "win_rate": [],
+        "stride": 1
+    }
+
+def update_lifetime(lifetime, player_choice, result):
+    lifetime["rounds"] += 1
+    lifetime["wins"] += result == "player"
+    lifetime["outcomes"][MOVES.index(player_choice)][RESULTS.index(result)] += 1
+    
+    if result == lifetime["streak_result"]:
+        lifetime["streak"] += 1
+    else:
+        lifetime["streak_result"] = result
+        lifetime["streak"] = 1
+    if result == "player":
+        lifetime["best_win_streak"] = max(lifetime["best_win_streak"], lifetime["streak"])
+    elif result == "computer":
+        lifetime["best_loss_streak"] = max(lifetime["best_loss_streak"], lifetime["streak"])
+    
+    if lifetime["rounds"] % lifetime["stride"] == 0:
+        lifetime["win_rate"].append((lifetime["rounds"], lifetime["wins"] / lifetime["rounds"] * 100))
+        if len(lifetime["win_rate"]) > WIN_RATE_POINTS:
+            lifetime["win_rate"] = lifetime["win_rate"][1::2]
+            lifetime["stride"] *= 2
+
 # Update scores based on result
 def update_scores(result):
     if result == "player":
@@ -178,8 +241,8 @@ def update_scores(result):
 
 # Main game function
 def play_game(player_choice):
-    # Computer makes a random choice
-    computer_choice = random.choice(["rock", "paper", "scissors"])
+    # Computer picks randomly, or counters the adaptive model's prediction
+    computer_choice = computer_move()
     
     # Store choices
     st.session_state.player_choice = player_choice
@@ -191,19 +254,19 @@ def play_game(player_choice):
     # Update scores
     update_scores(result)
     
+    # Learn from the player's move whichever opponent is playing
+    update_markov_model(st.session_state.markov, player_choice)
+    
     # Store result
     st.session_state.last_result = result
     
-    # Add to game history
-    st.session_state.game_history.append({
+    # Add to game history; the ring buffer keeps only the last RECENT_GAMES
+    ring_append(st.session_state.game_history, {
         "player": player_choice,
         "computer": computer_choice,
         "result": result
     })
-    
-    # Keep only last 10 games in history
-    if len(st.session_state.game_history) > 10:
-        st.session_state.game_history = st.session_state.game_history[-10:]
+    update_lifetime(st.session_state.lifetime, player_choice, result)
 
 # Main app
 def main():
@@ -297,16 +360,16 @@ def main():
             st.markdown('<div class="result-display lose-result">💻 Computer Wins!</div>', unsafe_allow_html=True)
     
     # Game history section
-    if st.session_state.game_history:
+    if st.session_state.game_history["count"]:
         st.markdown("---")
         st.markdown("<h3>Recent Games</h3>", unsafe_allow_html=True)
         
         # Create a table of recent games
         history_data = []
-        for i, game in enumerate(reversed(st.session_state.game_history)):
+        for i, game in enumerate(ring_newest_first(st.session_state.game_history)):
             result_emoji = "🤝" if game["result"] == "tie" else "🏆" if game["result"] == "player" else "💻"
             history_data.append({
-                "Game": len(st.session_state.game_history) - i,
+                "Game": st.session_state.game_history["count"] - i,
                 "Player": f"{get_emoji(game['player'])} {game['player'].title()}",
                 "Computer": f"{get_emoji(game['computer'])} {game['computer'].title()}",
                 "Result": result_emoji
@@ -314,6 +377,33 @@ def main():
         
         st.table(history_data)
     
+    # Lifetime stats section
+    lifetime = st.session_state.lifetime
+    if lifetime["rounds"]:
+        with st.expander(f"📈 Lifetime Stats ({lifetime['rounds']} rounds)"):
+            col1, col2, col3 = st.columns(3)
+            singular, plural = {"player": ("win", "wins"), "tie": ("tie", "ties"), "computer": ("loss", "losses")}[lifetime["streak_result"]]
+            streak_label = singular if lifetime["streak"] == 1 else plural
+            col1.metric("Win Rate", f"{lifetime['wins'] / lifetime['rounds']:.0%}")
+            col2.metric("Current Streak", f"{lifetime['streak']} {streak_label}")
+            col3.metric("Best Win Streak", lifetime["best_win_streak"], f"worst losing streak {lifetime['best_loss_streak']}", delta_color="off")
+            
+            move_data = []
+            for move, (won, tied, lost) in zip(MOVES, lifetime["outcomes"]):
+                played = won + tied + lost
+                move_data.append({
+                    "Your Move": f"{get_emoji(move)} {move.title()}",
+                    "Played": played,
+                    "Won": won,
+                    "Tied": tied,
+                    "Lost": lost,
+                    "Win Rate": f"{won / played:.0%}" if played else "-"
+                })
+            st.table(move_data)
+            
+            st.markdown("**Win rate over time**")
+            st.line_chart({"Win rate (%)": dict(lifetime["win_rate"])})
+    
     # Game rules section in sidebar
     with st.sidebar:
         st.markdown("## 📖 Game Rules")
@@ -332,6 +422,17 @@ def main():
         4. Track your score and game history
         """)
         
+        st.markdown("## 🤖 Opponent")
+        # Kept in plain session state: the move buttons rerun before the sidebar renders
+        st.session_state.opponent = st.radio(
+            "Opponent", OPPONENTS, index=OPPONENTS.index(st.session_state.opponent), label_visibility="collapsed",
+            help="Adaptive learns which move you tend to play after your last few moves and counters it"
+        )
+        order = st.slider("Moves remembered", 1, 3, value=st.session_state.markov["order"],
+                          disabled=st.session_state.opponent != OPPONENTS[1])
+        if order != st.session_state.markov["order"]:
+            st.session_state.markov = new_markov_model(order)
+        
         # Reset button in sidebar
         st.markdown("---")
         if st.button("🔄 Reset Game", use_container_width=True):
@@ -341,7 +442,8 @@ def main():
             st.session_state.last_result = ""
             st.session_state.computer_choice = ""
             st.session_state.player_choice = ""
-            st.session_state.game_history = []
+            st.session_state.game_history = new_ring(RECENT_GAMES)
+            st.session_state.markov = new_markov_model(st.session_state.markov["order"])
             st.rerun()
     
     # Footer
@@ -1,4 +1,17 @@
 import streamlit as st
+import pandas as pd
+import numpy as np
+import heapq
+import json
+import os
+import sqlite3
+import threading
+import time
+import zipfile
+from datetime import datetime
+from io import BytesIO
+from openpyxl import Workbook
+from result_cards import CARD_FORMATS, cards_zip_file, render_card
 
 # Page config
 st.set_page_config(
@@ -199,7 +212,358 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+MODES = ["👤 Single Student", "🏫 Class Sheet", "📊 Class Statistics", "📜 Transcripts", "🎯 Marks Needed"]
+HISTORY_DB = os.path.join(os.path.dirname(os.path.abspath(__file__)), "academy_history.db")
+TOP_PERFORMERS = 5
+STAT_PERCENTILES = [25, 50, 75, 90]
+# Uniform scores (percent of each remaining subject) plotted by the what-if solver
+WHATIF_SWEEP = np.arange(0, 101)
+# Upload extension -> pandas reader engine
+SHEET_ENGINES = {"xlsx": "openpyxl", "xls": "xlrd", "ods": "odf"}
+# What the readers raise for corrupt, renamed or wrongly encoded uploads;
+# a zip missing the workbook parts raises KeyError
+SHEET_READ_ERRORS = (zipfile.BadZipFile, KeyError, pd.errors.ParserError, UnicodeDecodeError, ValueError)
+
+# Grading schemes. `boundaries` are the ascending lower bounds (in percent) of
+# every label after the first; `subject_max_marks` overrides `max_marks` for
+# subjects by lower-case name.
+GRADING_SCHEMES = {
+    "Standard (150 marks)": {
+        "boundaries": [51, 61, 71, 81, 95],
+        "labels": ["F", "D", "C", "B", "A", "A*"],
+        "max_marks": 150,
+        "subject_max_marks": {},
+        "rounding": "half_even"
+    },
+    "Board (100 marks)": {
+        "boundaries": [33, 40, 50, 60, 70, 80],
+        "labels": ["F", "E", "D", "C", "B", "A", "A1"],
+        "max_marks": 100,
+        "subject_max_marks": {"practical": 50},
+        "rounding": "half_up"
+    }
+}
+
+# Rounding rule -> function applied to percentages before grading
+ROUNDING_RULES = {
+    "half_even": np.rint,
+    "half_up": lambda values: np.floor(np.asarray(values) + 0.5),
+    "floor": np.floor
+}
+
+# Grade engine
+def subject_max_marks(subjects, scheme):
+    overrides = scheme["subject_max_marks"]
+    return np.array([overrides.get(str(name).strip().lower(), scheme["max_marks"]) for name in subjects])
+
+def grade_percentages(percentage, scheme):
+    """Look up grades for a scalar percentage or an array of them."""
+    labels = np.asarray(scheme["labels"])
+    grades = labels[np.searchsorted(scheme["boundaries"], percentage, side="right")]
+    return grades.item() if grades.ndim == 0 else grades
+
+def compute_results(marks, max_marks, scheme):
+    """Totals, percentages and grades for one student (1-D marks) or a class (2-D)."""
+    total = marks.sum(axis=-1)
+    max_total = max_marks.sum()
+    percentage = ROUNDING_RULES[scheme["rounding"]](total / max_total * 100).astype(int)
+    return total, max_total, percentage, grade_percentages(percentage, scheme)
+
+# What-if solver
+def marks_needed(entered_total, remaining_max, max_total, scheme):
+    """Minimum combined marks in the remaining subjects for every grade label.
+
+    Grades every possible remaining total at once with the scheme's rounding,
+    then searches the (non-decreasing) grade index for each target. A value
+    above `remaining_max.sum()` means the grade is out of reach.
+    """
+    scored = np.arange(remaining_max.sum() + 1)
+    percentage = ROUNDING_RULES[scheme["rounding"]]((entered_total + scored) / max_total * 100)
+    level = np.searchsorted(scheme["boundaries"], percentage, side="right")
+    return np.searchsorted(level, np.arange(len(scheme["labels"])), side="left")
+
+def split_marks(needed, remaining_max):
+    """Spread each needed total across the remaining subjects in proportion to their max marks.
+
+    Rows are targets and columns are subjects; whole marks are handed out by
+    largest remainder so every row adds up to its (capped) total exactly.
+    """
+    needed = np.minimum(needed, remaining_max.sum())
+    share = needed[:, None] * remaining_max / remaining_max.sum()
+    marks = np.floor(share).astype(int)
+    short = needed - marks.sum(axis=1)
+    rank = np.argsort(np.argsort(marks - share, axis=1, kind="stable"), axis=1)
+    return marks + (rank < short[:, None])
+
+def uniform_sweep(entered_total, remaining_max, max_total, scheme):
+    """Final percentage for each uniform score in WHATIF_SWEEP across the remaining subjects."""
+    scored = np.floor(WHATIF_SWEEP[:, None] / 100 * remaining_max).sum(axis=1)
+    return ROUNDING_RULES[scheme["rounding"]]((entered_total + scored) / max_total * 100).astype(int)
+
+# Class sheet helpers
+def read_class_sheet(uploaded):
+    ext = uploaded.name.rsplit(".", 1)[-1].lower()
+    if ext == "csv":
+        return pd.read_csv(uploaded)
+    return pd.read_excel(uploaded, engine=SHEET_ENGINES[ext])
+
+def process_class_sheet(sheet, scheme):
+    """Grade a whole class in one vectorized pass.
+
+    The first column holds student names and every other column is a subject.
+    Returns the result frame and a boolean mask of invalid mark cells.
+    """
+    name_col, subjects = sheet.columns[0], list(sheet.columns[1:])
+    marks = sheet[subjects].apply(pd.to_numeric, errors="coerce").to_numpy(dtype=float)
+    max_marks = subject_max_marks(subjects, scheme)
+    invalid = np.isnan(marks) | (marks < 0) | (marks > max_marks)
+    
+    total, max_total, percentage, grade = compute_results(marks, max_marks, scheme)
+    
+    if not np.any(marks % 1):
+        marks, total = marks.astype(int), total.astype(int)
+    result = pd.DataFrame(marks, columns=subjects, index=sheet.index)
+    result.insert(0, "Name", sheet[name_col].astype(str).str.strip())
+    result["Total"] = total
+    result["Max Total"] = max_total
+    result["Percentage"] = percentage
+    result["Grade"] = grade
+    return result, invalid
+
+# Mergeable cohort aggregates. Moments combine with Chan's parallel form of
+# Welford's update and histograms hold counts per whole mark (or percent), so
+# merging one student into a class costs O(subjects + bins), not O(students).
+def empty_moments():
+    return {"count": 0, "mean": 0.0, "m2": 0.0, "min": np.inf, "max": -np.inf}
+
+def moments_of(values):
+    values = np.asarray(values, dtype=float)
+    if not len(values):
+        return empty_moments()
+    mean = values.mean()
+    return {
+        "count": len(values),
+        "mean": float(mean),
+        "m2": float(((values - mean) ** 2).sum()),
+        "min": float(values.min()),
+        "max": float(values.max())
+    }
+
+def merge_moments(a, b):
+    count = a["count"] + b["count"]
+    if count == 0:
+        return empty_moments()
+    delta = b["mean"] - a["mean"]
+    return {
+        "count": count,
+        "mean": a["mean"] + delta * b["count"] / count,
+        "m2": a["m2"] + b["m2"] + delta ** 2 * a["count"] * b["count"] / count,
+        "min": min(a["min"], b["min"]),
+        "max": max(a["max"], b["max"])
+    }
+
+def histogram_of(values, size):
+    bins = np.clip(np.floor(np.asarray(values, dtype=float)).astype(int), 0, size - 1)
+    return np.bincount(bins, minlength=size)
+
+def merge_histograms(a, b):
+    if len(a) < len(b):
+        a, b = b, a
+    merged = a.copy()
+    merged[:len(b)] += b
+    return merged
+
+def histogram_percentiles(hist, percentiles):
+    cumulative = np.cumsum(hist)
+    ranks = np.maximum(np.ceil(np.asarray(percentiles) / 100 * cumulative[-1]), 1)
+    return np.searchsorted(cumulative, ranks)
+
+def empty_cohort():
+    return {
+        "students": 0,
+        "percentage": empty_moments(),
+        "percentage_hist": np.zeros(101, dtype=int),
+        "grades": {},
+        "subjects": {},
+        "top": [],
+        "bottom": []
+    }
+
+def subject_key(name):
+    return " ".join(str(name).split()).title()
+
+def cohort_from_marks(names, subjects, marks, max_marks, percentage, grades):
+    """Build cohort aggregates from columnar arrays (one row of marks per student)."""
+    labels, counts = np.unique(grades, return_counts=True)
+    order = np.argsort(percentage, kind="stable")
+    k = min(TOP_PERFORMERS, len(order))
+    names = np.asarray(names)
+    return {
+        "students": len(order),
+        "percentage": moments_of(percentage),
+        "percentage_hist": histogram_of(percentage, 101),
+        "grades": dict(zip(labels.tolist(), counts.tolist())),
+        "subjects": {
+            subject_key(subject): {
+                "moments": moments_of(marks[:, j]),
+                "hist": histogram_of(marks[:, j], int(max_marks[j]) + 1)
+            }
+            for j, subject in enumerate(subjects)
+        },
+        "top": [(int(percentage[i]), str(names[i])) for i in order[::-1][:k]],
+        "bottom": [(int(percentage[i]), str(names[i])) for i in order[:k]]
+    }
+
+def merge_cohorts(a, b):
+    grades = dict(a["grades"])
+    for label, count in b["grades"].items():
+        grades[label] = grades.get(label, 0) + count
+    subjects = dict(a["subjects"])
+    for name, stats in b["subjects"].items():
+        if name in subjects:
+            stats = {
+                "moments": merge_moments(subjects[name]["moments"], stats["moments"]),
+                "hist": merge_histograms(subjects[name]["hist"], stats["hist"])
+            }
+        subjects[name] = stats
+    return {
+        "students": a["students"] + b["students"],
+        "percentage": merge_moments(a["percentage"], b["percentage"]),
+        "percentage_hist": merge_histograms(a["percentage_hist"], b["percentage_hist"]),
+        "grades": grades,
+        "subjects": subjects,
+        "top": heapq.nlargest(TOP_PERFORMERS, a["top"] + b["top"]),
+        "bottom": heapq.nsmallest(TOP_PERFORMERS, a["bottom"] + b["bottom"])
+    }
+
+def class_cards(result, scheme):
+    """Result card data for every graded row of a class sheet."""
+    subjects = list(result.columns[1:-4])
+    max_marks = subject_max_marks(subjects, scheme).tolist()
+    marks = result[subjects].to_numpy().tolist()
+    columns = ["Name", "Grade", "Percentage", "Total", "Max Total"]
+    return [
+        {
+            "name": name,
+            "grade": grade,
+            "percentage": int(percentage),
+            "total": total,
+            "max_total": int(max_total),
+            "subjects": list(zip(subjects, row_marks, max_marks))
+        }
+        for (name, grade, percentage, total, max_total), row_marks
+        in zip(result[columns].itertuples(index=False, name=None), marks)
+    ]
+
+# Term history
+class TermHistory:
+    """Per-student term results persisted to SQLite.
+
+    Each student has a row of running totals that is updated whenever a term
+    is saved, so a transcript reads that one row plus the student's terms
+    through the primary-key index instead of re-adding every term's subjects.
+    """
+    
+    def __init__(self, path):
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        with self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS students (
+                    student TEXT PRIMARY KEY, name TEXT,
+                    terms INTEGER, total REAL, max_total REAL
+                )
+            """)
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS terms (
+                    student TEXT, term TEXT, total REAL, max_total REAL,
+                    percentage INTEGER, grade TEXT, subjects TEXT, saved TEXT, created_ns INTEGER,
+                    PRIMARY KEY (student, term)
+                )
+            """)
+            # Older databases order terms by their last save until created_ns existed
+            columns = [row[1] for row in self.conn.execute("PRAGMA table_info(terms)")]
+            if "created_ns" not in columns:
+                self.conn.execute("ALTER TABLE terms ADD COLUMN created_ns INTEGER")
+                self.conn.execute("UPDATE terms SET created_ns = CAST(strftime('%s', saved) AS INTEGER) * 1000000000")
+    
+    @staticmethod
+    def key(name):
+        return " ".join(name.split()).lower()
+    
+    def save_term(self, name, term, result, subjects):
+        """Store one term, replacing an earlier save of the same term but keeping its place."""
+        student = self.key(name)
+        saved = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        with self.lock, self.conn:
+            previous = self.conn.execute(
+                "SELECT total, max_total, created_ns FROM terms WHERE student = ? AND term = ?", (student, term)
+            ).fetchone()
+            old_total, old_max, created_ns, new_term = (*previous, 0) if previous else (0, 0, time.time_ns(), 1)
+            self.conn.execute(
+                "INSERT OR REPLACE INTO terms VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (student, term, result["total"], result["max_total"], result["percentage"], result["grade"],
+                 json.dumps(subjects), saved, created_ns)
+            )
+            self.conn.execute(
+                """
+                INSERT INTO students VALUES (?, ?, 1, ?, ?)
+                ON CONFLICT (student) DO UPDATE SET
+                    name = excluded.name,
+                    terms = terms + ?,
+                    total = total + excluded.total - ?,
+                    max_total = max_total + excluded.max_total - ?
+                """,
+                (student, name, result["total"], result["max_total"], new_term, old_total, old_max)
+            )
+    
+    def summary(self, name):
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT name, terms, total, max_total FROM students WHERE student = ?", (self.key(name),)
+            ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(["name", "terms", "total", "max_total"], row))
+    
+    def transcript(self, name):
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT term, total, max_total, percentage, grade, subjects, saved FROM terms "
+                "WHERE student = ? ORDER BY created_ns",
+                (self.key(name),)
+            ).fetchall()
+        return [
+            dict(zip(["term", "total", "max_total", "percentage", "grade", "subjects", "saved"], row))
+            for row in rows
+        ]
+
+@st.cache_resource
+def get_history():
+    return TermHistory(HISTORY_DB)
+
+def class_sheet_xlsx(result):
+    # Write-only mode streams rows instead of building the whole sheet in memory
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Results")
+    sheet.append(list(result.columns))
+    for row in result.itertuples(index=False, name=None):
+        sheet.append(row)
+    buffer = BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
 # Initialize session state
+if 'mode' not in st.session_state:
+    st.session_state.mode = MODES[0]
+if 'scheme_name' not in st.session_state:
+    st.session_state.scheme_name = next(iter(GRADING_SCHEMES))
+if 'class_result' not in st.session_state:
+    # Graded upload, keyed by file id and scheme so reruns reuse it
+    st.session_state.class_result = None
+if 'cohort' not in st.session_state:
+    # Aggregates of single-student results, merged in one student at a time
+    st.session_state.cohort = empty_cohort()
 if 'step' not in st.session_state:
     st.session_state.step = 1
 if 'name' not in st.session_state:
@@ -215,11 +579,266 @@ if 'result' not in st.session_state:
 st.markdown('<div class="main-header">🎓 Academic Result Calculator</div>', unsafe_allow_html=True)
 st.markdown('<div class="subtitle">Professional grade calculation system</div>', unsafe_allow_html=True)
 
+# Mode selection
+with st.sidebar:
+    st.markdown("## ⚙️ Mode")
+    st.radio("Mode", MODES, key="mode", label_visibility="collapsed")
+    st.markdown("## 📐 Grading Scheme")
+    st.selectbox("Grading scheme", list(GRADING_SCHEMES), key="scheme_name", label_visibility="collapsed")
+
+scheme = GRADING_SCHEMES[st.session_state.scheme_name]
+
 # Main card container
 st.markdown('<div class="card">', unsafe_allow_html=True)
 
+# Class sheet: grade every student in an uploaded spreadsheet
+if st.session_state.mode == MODES[1]:
+    st.markdown('<h2 style="color: white; margin-bottom: 1.5rem;">Class Result Sheet</h2>', unsafe_allow_html=True)
+    st.markdown(f'<div class="welcome-box">Upload a sheet with student names in the first column and one column of marks (0-{scheme["max_marks"]}) per subject.</div>', unsafe_allow_html=True)
+    
+    uploaded = st.file_uploader("Class sheet", type=["xlsx", "xls", "ods", "csv"], label_visibility="collapsed")
+    
+    if uploaded is not None:
+        cached = st.session_state.class_result
+        sheet = None
+        if cached is None or (cached["file_id"], cached["scheme"]) != (uploaded.file_id, st.session_state.scheme_name):
+            try:
+                sheet = read_class_sheet(uploaded)
+            except SHEET_READ_ERRORS as e:
+                # Shown for this upload only; the last good result stays cached
+                cached = {"error": f"Could not read the sheet: {e}", "result": None, "invalid": None}
+        if sheet is not None:
+            cached = {"file_id": uploaded.file_id, "scheme": st.session_state.scheme_name,
+                      "result": None, "invalid": None, "cohort": None, "error": None}
+            if sheet.shape[1] >= 2:
+                result, invalid = process_class_sheet(sheet, scheme)
+                cached.update(result=result, invalid=invalid)
+                if not invalid.any():
+                    subjects = list(result.columns[1:sheet.shape[1]])
+                    cached["cohort"] = cohort_from_marks(
+                        result["Name"].to_numpy(),
+                        subjects,
+                        result[subjects].to_numpy(dtype=float),
+                        subject_max_marks(subjects, scheme),
+                        result["Percentage"].to_numpy(),
+                        result["Grade"].to_numpy()
+                    )
+            st.session_state.class_result = cached
+        result, invalid = cached["result"], cached["invalid"]
+        
+        if cached.get("error"):
+            st.error(f"❌ {cached['error']}")
+        elif result is None:
+            st.error("❌ The sheet needs a name column and at least one subject column")
+        elif invalid.any():
+            rows, cols = np.nonzero(invalid)
+            cells = ", ".join(f"row {r + 2} / {result.columns[c + 1]}" for r, c in zip(rows[:5], cols[:5]))
+            st.error(f"❌ {len(rows)} mark(s) are missing or above the subject's maximum: {cells}")
+        else:
+            col1, col2 = st.columns(2)
+            with col1:
+                st.markdown(f'''
+                <div class="stat-card">
+                    <p style="color: white; font-weight: bold; margin-bottom: 0.5rem;">🎓 Students</p>
+                    <div class="stat-value">{len(result)}</div>
+                </div>
+                ''', unsafe_allow_html=True)
+            with col2:
+                st.markdown(f'''
+                <div class="stat-card">
+                    <p style="color: white; font-weight: bold; margin-bottom: 0.5rem;">📈 Class Average</p>
+                    <div class="stat-value">{result["Percentage"].mean():.1f}%</div>
+                </div>
+                ''', unsafe_allow_html=True)
+            
+            st.markdown("<br>", unsafe_allow_html=True)
+            st.dataframe(result, use_container_width=True, hide_index=True)
+            
+            col1, col2 = st.columns(2)
+            with col1:
+                st.download_button(
+                    "📥 Download XLSX",
+                    data=lambda: class_sheet_xlsx(result),
+                    file_name="class_results.xlsx",
+                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+                )
+            with col2:
+                st.download_button(
+                    "📥 Download CSV",
+                    data=lambda: result.to_csv(index=False),
+                    file_name="class_results.csv",
+                    mime="text/csv"
+                )
+            
+            # Cards are rendered across a process pool only when the download is clicked
+            st.markdown("### 🖨️ Printable Result Cards")
+            card_format = st.radio("Card format", list(CARD_FORMATS), format_func=str.upper, horizontal=True, key="card_format")
+            st.download_button(
+                "📦 Download All Cards (ZIP)",
+                data=lambda: cards_zip_file(class_cards(result, scheme), card_format),
+                file_name=f"result_cards_{card_format}.zip",
+                mime="application/zip"
+            )
+
+# Class statistics: uploaded class sheet merged with single-student results
+elif st.session_state.mode == MODES[2]:
+    st.markdown('<h2 style="color: white; margin-bottom: 1.5rem;">Class Statistics</h2>', unsafe_allow_html=True)
+    
+    class_result = st.session_state.class_result
+    cohort = st.session_state.cohort
+    if class_result is not None and class_result["cohort"] is not None:
+        cohort = merge_cohorts(class_result["cohort"], cohort)
+    
+    if cohort["students"] == 0:
+        st.markdown('<div class="welcome-box">No results yet. Upload a class sheet, or calculate single-student results (they are added when you start the next student).</div>', unsafe_allow_html=True)
+    else:
+        moments = cohort["percentage"]
+        col1, col2, col3 = st.columns(3)
+        for col, label, value in [
+            (col1, "🎓 Students", cohort["students"]),
+            (col2, "📈 Mean", f'{moments["mean"]:.1f}%'),
+            (col3, "📏 Std Dev", f'{np.sqrt(moments["m2"] / moments["count"]):.1f}')
+        ]:
+            with col:
+                st.markdown(f'''
+                <div class="stat-card">
+                    <p style="color: white; font-weight: bold; margin-bottom: 0.5rem;">{label}</p>
+                    <div class="stat-value">{value}</div>
+                </div>
+                ''', unsafe_allow_html=True)
+        
+        st.markdown("<br>", unsafe_allow_html=True)
+        st.markdown("### 🏅 Grade Distribution")
+        st.bar_chart(pd.Series(cohort["grades"], name="Students"))
+        
+        st.markdown("### 📚 Subjects")
+        subject_rows = []
+        for name, stats in cohort["subjects"].items():
+            m = stats["moments"]
+            row = {"Subject": name, "Students": m["count"], "Mean": m["mean"],
+                   "Std Dev": np.sqrt(m["m2"] / m["count"]), "Min": m["min"], "Max": m["max"]}
+            for q, value in zip(STAT_PERCENTILES, histogram_percentiles(stats["hist"], STAT_PERCENTILES)):
+                row[f"P{q}"] = int(value)
+            subject_rows.append(row)
+        st.dataframe(
+            pd.DataFrame(subject_rows).round(1),
+            use_container_width=True,
+            hide_index=True
+        )
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            st.markdown("### 🏆 Top Performers")
+            st.dataframe(pd.DataFrame(cohort["top"], columns=["Percentage", "Name"])[["Name", "Percentage"]], hide_index=True, use_container_width=True)
+        with col2:
+            st.markdown("### 📉 Needs Support")
+            st.dataframe(pd.DataFrame(cohort["bottom"], columns=["Percentage", "Name"])[["Name", "Percentage"]], hide_index=True, use_container_width=True)
+
+# Transcripts: cumulative results across saved terms
+elif st.session_state.mode == MODES[3]:
+    st.markdown('<h2 style="color: white; margin-bottom: 1.5rem;">Student Transcript</h2>', unsafe_allow_html=True)
+    
+    student = st.text_input("Student name", placeholder="e.g., Ahmed Ali Khan", key="transcript_name")
+    if student.strip():
+        history = get_history()
+        summary = history.summary(student)
+        if summary is None:
+            st.info(f"No saved terms for {student.strip()}")
+        else:
+            cumulative = ROUNDING_RULES[scheme["rounding"]](summary["total"] / summary["max_total"] * 100)
+            col1, col2, col3 = st.columns(3)
+            for col, label, value in [
+                (col1, "📚 Terms", summary["terms"]),
+                (col2, "📈 Cumulative", f"{int(cumulative)}%"),
+                (col3, "🏅 Overall Grade", grade_percentages(cumulative, scheme))
+            ]:
+                with col:
+                    st.markdown(f'''
+                    <div class="stat-card">
+                        <p style="color: white; font-weight: bold; margin-bottom: 0.5rem;">{label}</p>
+                        <div class="stat-value">{value}</div>
+                    </div>
+                    ''', unsafe_allow_html=True)
+            
+            st.markdown("<br>", unsafe_allow_html=True)
+            st.markdown(f"### 📜 {summary['name']}")
+            for entry in history.transcript(student):
+                subjects = json.loads(entry["subjects"])
+                with st.expander(f'{entry["term"]} — {entry["grade"]} ({entry["percentage"]}%)'):
+                    st.markdown(f'**Total:** {entry["total"]:g}/{entry["max_total"]:g} · saved {entry["saved"]}')
+                    st.dataframe(pd.DataFrame(subjects), hide_index=True, use_container_width=True)
+
+# What-if: marks needed in the remaining subjects for each grade
+elif st.session_state.mode == MODES[4]:
+    st.markdown('<h2 style="color: white; margin-bottom: 1.5rem;">Marks Needed</h2>', unsafe_allow_html=True)
+    st.markdown('<div class="welcome-box">List every subject. Leave <strong>Marks</strong> empty for subjects you have not taken yet.</div>', unsafe_allow_html=True)
+    
+    rows = [{"Subject": sub["name"], "Marks": sub["marks"]} for sub in st.session_state.subjects]
+    rows = rows or [{"Subject": "", "Marks": None} for _ in range(3)]
+    largest_max = max([scheme["max_marks"], *scheme["subject_max_marks"].values()])
+    edited = st.data_editor(
+        pd.DataFrame(rows, columns=["Subject", "Marks"]).astype({"Marks": "Int64"}),
+        num_rows="dynamic",
+        hide_index=True,
+        use_container_width=True,
+        column_config={
+            "Subject": st.column_config.TextColumn("Subject"),
+            "Marks": st.column_config.NumberColumn("Marks", min_value=0, max_value=largest_max, step=1)
+        },
+        key="whatif_editor"
+    )
+    
+    names = edited["Subject"].fillna("").astype(str).str.strip()
+    listed = names != ""
+    names = names[listed].reset_index(drop=True)
+    marks = pd.to_numeric(edited["Marks"][listed], errors="coerce").reset_index(drop=True)
+    max_marks = subject_max_marks(names, scheme)
+    remaining = marks.isna().to_numpy()
+    bad_names = ~names.str.replace(" ", "").str.isalpha()
+    bad_marks = ~remaining & ((marks < 0) | (marks > max_marks)).to_numpy()
+    
+    if names.empty:
+        st.info("List your subjects above, with marks for the ones you have already taken.")
+    elif bad_names.any():
+        rows_text = ", ".join(str(i + 1) for i in np.flatnonzero(bad_names))
+        st.error(f"❌ Subject name can only contain letters (row {rows_text})")
+    elif bad_marks.any():
+        rows_text = ", ".join(f"{names[i]} (0-{max_marks[i]})" for i in np.flatnonzero(bad_marks))
+        st.error(f"❌ Marks out of range: {rows_text}")
+    elif not remaining.any():
+        st.info("Every subject already has marks. Leave some empty to see what you need in them.")
+    else:
+        entered_total = marks[~remaining].sum()
+        remaining_max = max_marks[remaining]
+        max_total = max_marks.sum()
+        labels = scheme["labels"][1:]
+        needed = marks_needed(entered_total, remaining_max, max_total, scheme)[1:]
+        split = split_marks(needed, remaining_max)
+        
+        reachable = needed <= remaining_max.sum()
+        answer = pd.DataFrame({
+            "Grade": labels,
+            "Status": np.select([needed == 0, reachable], ["✅ Secured", "🎯 Reachable"], "❌ Out of reach"),
+            "Marks Needed": needed,
+            "Average Needed": [f"{round(value / remaining_max.sum() * 100)}%" for value in needed]
+        })
+        for name, column in zip(names[remaining], split.T):
+            answer[name] = column
+        # Unreachable targets have no meaningful split, so leave their cells blank
+        answer = answer.astype({name: "Int64" for name in ["Marks Needed", *names[remaining]]})
+        answer.loc[~reachable, answer.columns[2:]] = None
+        
+        st.markdown(f"### 🎯 Needed in {remaining.sum()} remaining subject(s) (out of {remaining_max.sum()})")
+        st.dataframe(answer.iloc[::-1], hide_index=True, use_container_width=True)
+        st.caption("Subject columns split each total in proportion to the subject's max marks.")
+        
+        st.markdown("### 📈 Final Percentage by Remaining Score")
+        sweep = pd.Series(uniform_sweep(entered_total, remaining_max, max_total, scheme), index=WHATIF_SWEEP, name="Final %")
+        sweep.index.name = "Score in each remaining subject (%)"
+        st.line_chart(sweep)
+
 # Step 1: Name Input
-if st.session_state.step == 1:
+elif st.session_state.step == 1:
     st.markdown('<h2 style="color: white; margin-bottom: 1.5rem;">Student Name</h2>', unsafe_allow_html=True)
     
     st.markdown('<label style="font-size: 1.2rem; font-weight: 600; color: white; display: block; margin-bottom: 0.5rem;">Enter your full name</label>', unsafe_allow_html=True)
@@ -260,65 +879,62 @@ elif st.session_state.step == 2:
 elif st.session_state.step == 3:
     st.markdown('<h2 style="color: white; margin-bottom: 1.5rem;">Enter Subject Details</h2>', unsafe_allow_html=True)
     
-    # Progress
-    progress = len(st.session_state.subjects) / st.session_state.num_subjects
-    st.markdown(f'<div class="welcome-box"><strong>Progress: {len(st.session_state.subjects)} / {st.session_state.num_subjects}</strong></div>', unsafe_allow_html=True)
-    st.markdown(f'<div class="progress-bar"><div class="progress-fill" style="width: {progress*100}%"></div></div>', unsafe_allow_html=True)
-    st.markdown("<br>", unsafe_allow_html=True)
+    num_subjects = st.session_state.num_subjects
+    st.markdown(f'<div class="welcome-box"><strong>Enter the name and marks for all {num_subjects} subjects, then calculate once.</strong></div>', unsafe_allow_html=True)
     
-    # Display added subjects
-    if st.session_state.subjects:
-        st.markdown("### ✅ Added Subjects")
-        for idx, sub in enumerate(st.session_state.subjects):
-            st.markdown(f'<div class="subject-item"><span><strong>{idx+1}. {sub["name"]}</strong></span><span><strong>{sub["marks"]}/150</strong></span></div>', unsafe_allow_html=True)
-        st.markdown("<br>", unsafe_allow_html=True)
+    # Start from the subjects entered so far, so editing keeps earlier entries
+    entered = st.session_state.subjects[:num_subjects]
+    rows = [{"Subject": sub["name"], "Marks": sub["marks"]} for sub in entered]
+    rows += [{"Subject": "", "Marks": 0} for _ in range(num_subjects - len(rows))]
+    largest_max = max([scheme["max_marks"], *scheme["subject_max_marks"].values()])
     
-    # Current subject input
-    if len(st.session_state.subjects) < st.session_state.num_subjects:
-        st.markdown(f"### Subject {len(st.session_state.subjects) + 1}")
-        
-        st.markdown('<label style="font-size: 1.1rem; font-weight: 600; color: white; display: block; margin-bottom: 0.5rem;">Subject Name</label>', unsafe_allow_html=True)
-        subject_name = st.text_input("Subject Name", key=f"sub_name_{len(st.session_state.subjects)}", placeholder="e.g., Mathematics", label_visibility="collapsed")
-        
-        st.markdown('<label style="font-size: 1.1rem; font-weight: 600; color: white; display: block; margin-bottom: 0.5rem;">Marks (0-150)</label>', unsafe_allow_html=True)
-        subject_marks = st.number_input("Marks (0-150)", min_value=0, max_value=150, step=1, key=f"sub_marks_{len(st.session_state.subjects)}", label_visibility="collapsed")
-        
-        btn_text = "🎯 Calculate Result" if len(st.session_state.subjects) + 1 == st.session_state.num_subjects else "✓ Add Subject"
+    with st.form("subjects_form"):
+        edited = st.data_editor(
+            pd.DataFrame(rows),
+            num_rows="fixed",
+            hide_index=True,
+            use_container_width=True,
+            column_config={
+                "Subject": st.column_config.TextColumn("Subject", required=True),
+                "Marks": st.column_config.NumberColumn("Marks", min_value=0, max_value=largest_max, step=1, required=True)
+            },
+            key="subjects_editor"
+        )
+        submitted = st.form_submit_button("🎯 Calculate Result")
+    
+    if submitted:
+        # Validate every row at once
+        names = edited["Subject"].fillna("").astype(str).str.strip()
+        marks = pd.to_numeric(edited["Marks"], errors="coerce")
+        max_marks = subject_max_marks(names, scheme)
+        bad_names = ~names.str.replace(" ", "").str.isalpha()
+        bad_marks = marks.isna() | (marks < 0) | (marks > max_marks)
         
-        if st.button(btn_text, key="add_btn"):
-            if subject_name and subject_name.replace(" ", "").isalpha():
-                st.session_state.subjects.append({"name": subject_name, "marks": subject_marks})
-                
-                if len(st.session_state.subjects) == st.session_state.num_subjects:
-                    # Calculate result
-                    total = sum(sub["marks"] for sub in st.session_state.subjects)
-                    max_total = st.session_state.num_subjects * 150
-                    percentage = round((total / max_total) * 100)
-                    
-                    if percentage >= 95:
-                        grade = "A*"
-                    elif percentage >= 81:
-                        grade = "A"
-                    elif percentage >= 71:
-                        grade = "B"
-                    elif percentage >= 61:
-                        grade = "C"
-                    elif percentage >= 51:
-                        grade = "D"
-                    else:
-                        grade = "F"
-                    
-                    st.session_state.result = {
-                        "total": total,
-                        "max_total": max_total,
-                        "percentage": percentage,
-                        "grade": grade
-                    }
-                    st.session_state.step = 4
-                
-                st.rerun()
-            else:
-                st.error("❌ Subject name can only contain letters")
+        if bad_names.any():
+            rows_text = ", ".join(str(i + 1) for i in np.flatnonzero(bad_names))
+            st.error(f"❌ Subject name can only contain letters (row {rows_text})")
+        elif bad_marks.any():
+            rows_text = ", ".join(f"{names[i]} (0-{max_marks[i]})" for i in np.flatnonzero(bad_marks))
+            st.error(f"❌ Marks out of range: {rows_text}")
+        else:
+            marks = marks.to_numpy(dtype=int)
+            st.session_state.subjects = [
+                {"name": name, "marks": int(mark), "max": int(max_mark)}
+                for name, mark, max_mark in zip(names, marks, max_marks)
+            ]
+            total, max_total, percentage, grade = compute_results(marks, max_marks, scheme)
+            st.session_state.result = {
+                "total": int(total),
+                "max_total": int(max_total),
+                "percentage": int(percentage),
+                "grade": grade
+            }
+            st.session_state.step = 4
+            st.rerun()
+    
+    if st.button("← Back", key="back_2"):
+        st.session_state.step = 2
+        st.rerun()
 
 # Step 4: Results
 elif st.session_state.step == 4:
@@ -352,23 +968,70 @@ elif st.session_state.step == 4:
     # Subject breakdown
     st.markdown("### 📊 Subject Breakdown")
     for idx, sub in enumerate(st.session_state.subjects):
-        sub_percentage = round((sub["marks"] / 150) * 100)
+        sub_percentage = round((sub["marks"] / sub["max"]) * 100)
         st.markdown(f'''
         <div class="subject-item">
             <span style="color: white;"><strong>{idx+1}. {sub["name"]}</strong></span>
-            <span style="color: white;"><strong>{sub["marks"]}/150</strong> <span style="color: #64b5f6;">({sub_percentage}%)</span></span>
+            <span style="color: white;"><strong>{sub["marks"]}/{sub["max"]}</strong> <span style="color: #64b5f6;">({sub_percentage}%)</span></span>
         </div>
         ''', unsafe_allow_html=True)
     
     st.markdown("<br>", unsafe_allow_html=True)
     
-    if st.button("🔄 Calculate Another Result", key="reset_btn"):
-        st.session_state.step = 1
-        st.session_state.name = ''
-        st.session_state.num_subjects = 0
-        st.session_state.subjects = []
-        st.session_state.result = None
-        st.rerun()
+    card = {
+        "name": st.session_state.name,
+        **{key: st.session_state.result[key] for key in ["grade", "percentage", "total", "max_total"]},
+        "subjects": [(sub["name"], sub["marks"], sub["max"]) for sub in st.session_state.subjects]
+    }
+    col1, col2 = st.columns(2)
+    for col, fmt in zip([col1, col2], CARD_FORMATS):
+        with col:
+            st.download_button(
+                f"🖨️ Download Card ({fmt.upper()})",
+                data=lambda fmt=fmt: render_card(card, fmt),
+                file_name=f"result_card.{fmt}",
+                mime="image/png" if fmt == "png" else "application/pdf",
+                key=f"card_{fmt}"
+            )
+    
+    # Keep this term in the student's persistent history
+    with st.form("save_term_form"):
+        term = st.text_input("Term", placeholder="e.g., Fall 2026")
+        if st.form_submit_button("💾 Save Term to History"):
+            if term.strip():
+                get_history().save_term(
+                    st.session_state.name,
+                    term.strip(),
+                    st.session_state.result,
+                    [{"name": sub["name"], "marks": sub["marks"], "max": sub["max"]} for sub in st.session_state.subjects]
+                )
+                st.success(f"✅ Saved {term.strip()} for {st.session_state.name}")
+            else:
+                st.error("❌ Please enter a term name")
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("✏️ Edit Subjects", key="edit_btn"):
+            st.session_state.step = 3
+            st.rerun()
+    with col2:
+        if st.button("🔄 Calculate Another Result", key="reset_btn"):
+            # The finished result joins the class statistics once, after any edits
+            subjects = st.session_state.subjects
+            st.session_state.cohort = merge_cohorts(st.session_state.cohort, cohort_from_marks(
+                [st.session_state.name],
+                [sub["name"] for sub in subjects],
+                np.array([[sub["marks"] for sub in subjects]], dtype=float),
+                [sub["max"] for sub in subjects],
+                np.array([st.session_state.result["percentage"]]),
+                np.array([st.session_state.result["grade"]])
+            ))
+            st.session_state.step = 1
+            st.session_state.name = ''
+            st.session_state.num_subjects = 0
+            st.session_state.subjects = []
+            st.session_state.result = None
+            st.rerun()
 
 st.markdown('</div>', unsafe_allow_html=True)
 
@@ -1,4 +1,22 @@
 import streamlit as st
+import numpy as np
+import pandas as pd
+import ast
+import json
+import math
+import operator
+import os
+import re
+import sqlite3
+import threading
+import zipfile
+from datetime import datetime
+from decimal import Decimal, localcontext
+from fractions import Fraction
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+from io import BytesIO, StringIO
+from sqlite_writer import BatchWriter
 
 # Page configuration
 st.set_page_config(
@@ -42,11 +60,383 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
+MODES = ["🧮 Step by Step", "⌨️ Expression", "📊 Batch", "🕘 History", "🔬 Precision", "📐 Statistics & Matrices"]
+EXPRESSION_CACHE_SIZE = 256
+# Integer powers larger than this many digits are refused instead of hanging the app
+MAX_POWER_DIGITS = 1_000_000
+MAX_FACTORIAL = 100_000
+# Precision mode shows this many leading and trailing digits of long results
+PREVIEW_DIGITS = 50
+# Number type -> number system used by the expression engine
+PRECISION_TYPES = {"Exact fractions": "fraction", "Decimal": "decimal"}
+HISTORY_DB = os.path.join(os.path.dirname(os.path.abspath(__file__)), "calculator_history.db")
+HISTORY_PAGE_SIZE = 20
+# Wizard operation -> operator as typed in an expression, so history entries can be recalled there
+WIZARD_OPERATORS = {"add": "+", "subtract": "-", "multiply": "*", "divide": "/"}
+
+# Expression engine. Expressions are parsed with `ast` and only the node types
+# below are accepted, so nothing in the text can reach Python builtins.
+def power(base, exponent):
+    if isinstance(base, (int, Fraction)) and isinstance(exponent, int) and exponent != 0:
+        size = max(abs(base.numerator), base.denominator)
+        if size > 1 and abs(exponent) * math.log10(size) > MAX_POWER_DIGITS:
+            raise OverflowError(f"result would have more than {MAX_POWER_DIGITS:,} digits")
+    return operator.pow(base, exponent)
+
+def exact_power(base, exponent):
+    if isinstance(exponent, Fraction):
+        if exponent.denominator != 1:
+            raise ValueError("fractional powers are not exact, use Decimal")
+        exponent = exponent.numerator
+    # int ** negative int is a float, so raise the base as a Fraction instead
+    if isinstance(exponent, int) and exponent < 0:
+        base = Fraction(base)
+    return power(base, exponent)
+
+def decimal_power(base, exponent):
+    if isinstance(exponent, int) and exponent < 0:
+        # Decimal gives Infinity for 0 ** -n; report it like a division by zero
+        if base == 0:
+            raise ZeroDivisionError("0 cannot be raised to a negative power")
+        base = Decimal(base)
+    return power(base, exponent)
+
+def whole_number(value):
+    if value != int(value):
+        raise ValueError(f"{value} is not a whole number")
+    return int(value)
+
+def factorial(value):
+    value = whole_number(value)
+    if value > MAX_FACTORIAL:
+        raise OverflowError(f"factorial is limited to {MAX_FACTORIAL:,}")
+    return math.factorial(value)
+
+def exact_sqrt(value):
+    value = Fraction(value)
+    if value < 0:
+        raise ValueError("square root of a negative number")
+    root = Fraction(math.isqrt(value.numerator), math.isqrt(value.denominator))
+    if root * root != value:
+        raise ValueError(f"sqrt({value}) is not exact, use Decimal")
+    return root
+
+BINARY_OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: power
+}
+UNARY_OPERATORS = {ast.UAdd: operator.pos, ast.USub: operator.neg}
+# NumPy functions work on plain numbers and on whole columns alike
+FUNCTIONS = {
+    "abs": np.abs, "sqrt": np.sqrt, "exp": np.exp, "log": np.log, "log10": np.log10,
+    "sin": np.sin, "cos": np.cos, "tan": np.tan, "floor": np.floor, "ceil": np.ceil,
+    "round": np.round, "min": np.minimum, "max": np.maximum
+}
+CONSTANTS = {"pi": math.pi, "e": math.e}
+EXACT_FUNCTIONS = {
+    "abs": abs, "floor": math.floor, "ceil": math.ceil, "round": round, "min": min, "max": max,
+    "factorial": factorial, "gcd": lambda a, b: math.gcd(whole_number(a), whole_number(b))
+}
+
+# Number system -> how literals with a decimal point are read, and the
+# operators, functions and constants available. Whole-number literals are
+# always Python ints, which are exact at any size.
+NUMBER_SYSTEMS = {
+    "float": {
+        "literal": float,
+        "operators": BINARY_OPERATORS,
+        "functions": FUNCTIONS,
+        "constants": CONSTANTS
+    },
+    "fraction": {
+        "literal": Fraction,
+        "operators": {**BINARY_OPERATORS, ast.Div: lambda a, b: Fraction(a) / b, ast.Pow: exact_power},
+        "functions": {**EXACT_FUNCTIONS, "sqrt": exact_sqrt},
+        "constants": {}
+    },
+    "decimal": {
+        "literal": Decimal,
+        "operators": {**BINARY_OPERATORS, ast.Div: lambda a, b: Decimal(a) / b, ast.Pow: decimal_power},
+        "functions": {
+            **EXACT_FUNCTIONS,
+            "sqrt": lambda value: Decimal(value).sqrt(),
+            "exp": lambda value: Decimal(value).exp(),
+            "log": lambda value: Decimal(value).ln(),
+            "log10": lambda value: Decimal(value).log10()
+        },
+        "constants": {}
+    }
+}
+
+def compile_node(node, names, system, source):
+    """Turn a validated AST node into a closure taking the variable dict."""
+    rules = NUMBER_SYSTEMS[system]
+    if isinstance(node, ast.Constant) and type(node.value) in (int, float):
+        # Read decimals from the typed text, so 0.1 is exact in the exact systems
+        value = node.value if type(node.value) is int else rules["literal"](ast.get_source_segment(source, node))
+        return lambda variables: value
+    if isinstance(node, ast.Name):
+        if node.id in rules["constants"]:
+            value = rules["constants"][node.id]
+            return lambda variables: value
+        names.add(node.id)
+        name = node.id
+        return lambda variables: variables[name]
+    if isinstance(node, ast.BinOp) and type(node.op) in rules["operators"]:
+        op = rules["operators"][type(node.op)]
+        left, right = compile_node(node.left, names, system, source), compile_node(node.right, names, system, source)
+        return lambda variables: op(left(variables), right(variables))
+    if isinstance(node, ast.UnaryOp) and type(node.op) in UNARY_OPERATORS:
+        op = UNARY_OPERATORS[type(node.op)]
+        operand = compile_node(node.operand, names, system, source)
+        return lambda variables: op(operand(variables))
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and not node.keywords:
+        if node.func.id not in rules["functions"]:
+            raise ValueError(f"Unknown function: {node.func.id}")
+        function = rules["functions"][node.func.id]
+        args = [compile_node(arg, names, system, source) for arg in node.args]
+        return lambda variables: function(*(arg(variables) for arg in args))
+    raise ValueError(f"Unsupported syntax: {ast.unparse(node)}")
+
+@st.cache_resource(max_entries=EXPRESSION_CACHE_SIZE, show_spinner=False)
+def compile_expression(text, system="float"):
+    """Parse and compile an expression once; returns (evaluate, variable names).
+
+    Cached across reruns and sessions, so evaluating the same text with new
+    variable values skips parsing entirely.
+    """
+    names = set()
+    source = text.replace("^", "**")
+    try:
+        evaluate = compile_node(ast.parse(source, mode="eval").body, names, system, source)
+    except (SyntaxError, RecursionError):
+        raise ValueError("Invalid expression") from None
+    except ArithmeticError:
+        # e.g. a literal Decimal cannot read
+        raise ValueError("Invalid number") from None
+    return evaluate, sorted(names)
+
+# Precision mode: previews of huge exact results without converting them in full
+def digit_count(value):
+    value = abs(value)
+    if value == 0:
+        return 1
+    digits = int(value.bit_length() * math.log10(2)) + 1
+    return digits - (value < 10 ** (digits - 1))
+
+def preview_int(value, digits=PREVIEW_DIGITS):
+    """Leading and trailing digits of an int, without converting all of it to text."""
+    count = digit_count(value)
+    if count <= 2 * digits:
+        return str(value)
+    sign = "-" if value < 0 else ""
+    value = abs(value)
+    return f"{sign}{value // 10 ** (count - digits)}…{value % 10 ** digits:0{digits}d}"
+
+def preview_number(value):
+    if isinstance(value, Fraction):
+        if value.denominator == 1:
+            return preview_int(value.numerator)
+        return f"{preview_int(value.numerator)} / {preview_int(value.denominator)}"
+    if isinstance(value, int):
+        return preview_int(value)
+    if not isinstance(value, Decimal):
+        raise TypeError(f"{type(value).__name__} is not an exact result")
+    text = str(value)
+    return text if len(text) <= 2 * PREVIEW_DIGITS else f"{text[:PREVIEW_DIGITS]}…{text[-PREVIEW_DIGITS:]}"
+
+def preview_result(value):
+    """A float-mode result as text; ints too long for str() show their leading and trailing digits."""
+    return preview_int(value) if isinstance(value, int) else str(value)
+
+def exact_text(value):
+    """The full value as text; Decimal converts ints of any size, unlike str() on Python 3.11+."""
+    if isinstance(value, Fraction):
+        return exact_text(value.numerator) if value.denominator == 1 else f"{exact_text(value.numerator)}/{exact_text(value.denominator)}"
+    if isinstance(value, int):
+        return str(Decimal(value))
+    return str(value)
+
+def result_size(value):
+    if isinstance(value, Fraction):
+        return digit_count(value.numerator) + (digit_count(value.denominator) if value.denominator != 1 else 0)
+    if isinstance(value, int):
+        return digit_count(value)
+    if isinstance(value, Decimal):
+        return len(value.as_tuple().digits)
+    raise TypeError(f"{type(value).__name__} is not an exact result")
+
+def parse_exact(text, system):
+    """A variable's value: whole numbers as ints, anything else in the number system."""
+    try:
+        return int(text) if text.lstrip("+-").isdigit() else NUMBER_SYSTEMS[system]["literal"](text)
+    except (ArithmeticError, ValueError):
+        raise ValueError(f"'{text}' is not a number") from None
+
+# Batch mode: column-wise operations. Operation -> (symbol, NumPy function)
+BATCH_OPERATIONS = {
+    "➕ Add": ("+", np.add),
+    "➖ Subtract": ("-", np.subtract),
+    "✖️ Multiply": ("×", np.multiply),
+    "➗ Divide": ("÷", np.divide)
+}
+BATCH_PREVIEW_ROWS = 1000
+
+def read_batch(uploaded, pasted):
+    """Read the upload (or pasted text with a header line) as float columns."""
+    if uploaded is not None:
+        if uploaded.name.lower().endswith(".csv"):
+            frame = pd.read_csv(uploaded)
+        else:
+            frame = pd.read_excel(uploaded, engine="openpyxl")
+    else:
+        # Let pandas sniff commas or tabs, so cells copied from a spreadsheet work too
+        frame = pd.read_csv(StringIO(pasted), sep=None, engine="python")
+    # Anything non-numeric becomes NaN and is reported per row after calculating
+    return frame.apply(pd.to_numeric, errors="coerce").astype(float)
+
+def column_variable(column):
+    """Variable name an expression uses for a column, e.g. 'unit price' -> unit_price."""
+    name = re.sub(r"\W", "_", str(column).strip())
+    return f"_{name}" if not name or name[0].isdigit() else name
+
+def calculate_batch(frame, evaluate, columns):
+    """Evaluate over whole columns; undefined elements (x/0, sqrt(-1), bad input) become NaN."""
+    with np.errstate(all="ignore"):
+        values = evaluate({name: frame[column].to_numpy() for name, column in columns.items()})
+    values = np.broadcast_to(np.asarray(values, dtype=float), len(frame)).copy()
+    undefined = ~np.isfinite(values)
+    values[undefined] = np.nan
+    return values, undefined
+
+def batch_csv(result):
+    # pyarrow's CSV writer formats a million floats about 15x faster than DataFrame.to_csv
+    buffer = BytesIO()
+    pa_csv.write_csv(pa.Table.from_pandas(result, preserve_index=False), buffer)
+    return buffer.getvalue()
+
+# Statistics & matrices. Operation -> (needs B, function of A, B and percentiles).
+# Statistics run over a vector, or per column of a matrix.
+ARRAY_OPERATIONS = {
+    "Mean": (False, lambda a, b, q: np.mean(a, axis=0)),
+    "Median": (False, lambda a, b, q: np.median(a, axis=0)),
+    "Standard Deviation": (False, lambda a, b, q: np.std(a, axis=0)),
+    "Percentiles": (False, lambda a, b, q: np.percentile(a, q, axis=0)),
+    "Dot Product (A · B)": (True, lambda a, b, q: np.dot(a, b)),
+    "Matrix Multiply (A × B)": (True, lambda a, b, q: np.matmul(a, b)),
+    "Inverse (A⁻¹)": (False, lambda a, b, q: np.linalg.inv(a)),
+    "Solve (A x = B)": (True, lambda a, b, q: np.linalg.solve(a, b))
+}
+
+def parse_array(text):
+    """Parse pasted numbers: one line is a vector, several lines are matrix rows.
+
+    Values may be separated by commas or whitespace. A single column is
+    treated as a vector.
+    """
+    rows = [line.split() for line in text.replace(",", " ").splitlines() if line.strip()]
+    if len({len(row) for row in rows}) > 1:
+        raise ValueError("every row needs the same number of values")
+    array = np.array(rows, dtype=float)
+    return array.ravel() if 1 in array.shape else array
+
+def describe_shape(array):
+    return f"vector of {array.size:,}" if array.ndim == 1 else f"{array.shape[0]:,}×{array.shape[1]:,} matrix"
+
+# Calculation history
+class CalculationHistory:
+    """Every calculation and its result, shared by all sessions and persisted to SQLite.
+
+    Entries are indexed by expression text (whitespace ignored) and then by
+    variable values, so a repeated calculation is a dict lookup. New entries
+    are queued and written in batches by a background thread.
+    """
+    
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.entries = []
+        self.index = {}
+        
+        conn = sqlite3.connect(path)
+        with conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS history (
+                    expression TEXT, variables TEXT, result TEXT, timestamp TEXT
+                )
+            """)
+        for expression, variables, result, timestamp in conn.execute(
+            "SELECT expression, variables, result, timestamp FROM history ORDER BY rowid"
+        ):
+            self._add(expression, json.loads(variables), result, timestamp)
+        conn.close()
+        
+        self.writer = BatchWriter(path, "INSERT INTO history VALUES (?, ?, ?, ?)")
+    
+    @staticmethod
+    def key(expression):
+        return "".join(expression.split())
+    
+    def _add(self, expression, variables, result, timestamp):
+        self.index.setdefault(self.key(expression), {})[tuple(sorted(variables.items()))] = len(self.entries)
+        self.entries.append({"expression": expression, "variables": variables, "result": result, "timestamp": timestamp})
+    
+    def recall(self, expression, variables=None):
+        """The stored result for this expression and variable values, or None."""
+        with self.lock:
+            position = self.index.get(self.key(expression), {}).get(tuple(sorted((variables or {}).items())))
+            return None if position is None else self.entries[position]["result"]
+    
+    def record(self, expression, variables, result):
+        variables = variables or {}
+        timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        with self.lock:
+            if tuple(sorted(variables.items())) in self.index.get(self.key(expression), {}):
+                return
+            # Huge ints are stored as their preview; str() refuses them and the full text is slow to build
+            text = preview_result(result)
+            self._add(expression, variables, text, timestamp)
+        self.writer.put([(expression, json.dumps(variables), text, timestamp)])
+    
+    def find(self, expression):
+        """Every stored variant of one expression, newest first."""
+        with self.lock:
+            positions = sorted(self.index.get(self.key(expression), {}).values(), reverse=True)
+            return [self.entries[position] for position in positions]
+    
+    def page(self, number, size=HISTORY_PAGE_SIZE):
+        """One page of entries, newest first; page 1 is the most recent."""
+        with self.lock:
+            end = max(len(self.entries) - (number - 1) * size, 0)
+            return self.entries[max(end - size, 0):end][::-1]
+    
+    def __len__(self):
+        return len(self.entries)
+    
+    def close(self):
+        """Flush queued rows and stop the writer."""
+        self.writer.close()
+
+@st.cache_resource
+def get_history():
+    return CalculationHistory(HISTORY_DB)
+
+def format_variables(variables):
+    return ", ".join(f"{name} = {value}" for name, value in variables.items())
+
 # Title and header
 st.title("🔢 Simple Calculator")
 st.markdown("---")
 
 # Session state initialization
+if 'mode' not in st.session_state:
+    st.session_state.mode = MODES[0]
 if 'step' not in st.session_state:
     st.session_state.step = 1
 if 'name' not in st.session_state:
@@ -59,9 +449,330 @@ if 'num3' not in st.session_state:
     st.session_state.num3 = None
 if 'result' not in st.session_state:
     st.session_state.result = None
+if 'batch' not in st.session_state:
+    st.session_state.batch = None
+if 'precision' not in st.session_state:
+    st.session_state.precision = None
+if 'arrays' not in st.session_state:
+    st.session_state.arrays = {}
+
+# Mode selection
+with st.sidebar:
+    st.markdown("## ⚙️ Mode")
+    st.radio("Mode", MODES, key="mode", label_visibility="collapsed")
+
+# Expression mode: one typed expression instead of the wizard
+if st.session_state.mode == MODES[1]:
+    st.subheader("⌨️ Expression")
+    expression = st.text_input(
+        "Expression:",
+        placeholder="(a + b) * sqrt(c) / 2",
+        key="expression"
+    )
+    st.caption(
+        "Operators: `+ - * / // % **` (or `^`) and parentheses. "
+        f"Functions: {', '.join(FUNCTIONS)}. Constants: {', '.join(CONSTANTS)}. "
+        "Any other name becomes a variable."
+    )
+    
+    if expression.strip():
+        try:
+            evaluate, names = compile_expression(expression.strip())
+        except ValueError as e:
+            st.error(f"❌ {e}")
+        else:
+            variables = {}
+            if names:
+                st.write("Variables:")
+                cols = st.columns(min(len(names), 4))
+                for i, name in enumerate(names):
+                    with cols[i % len(cols)]:
+                        variables[name] = st.number_input(f"{name} =", value=0.0, key=f"var_{name}")
+            
+            # A calculation that was done before comes straight from the history
+            history = get_history()
+            result = history.recall(expression, variables)
+            if result is not None:
+                st.caption("🕘 Recalled from history")
+            else:
+                try:
+                    # Raise on domain errors like sqrt(-1) instead of returning nan
+                    with np.errstate(all="raise"):
+                        result = evaluate(variables)
+                    history.record(expression.strip(), variables, result)
+                except ZeroDivisionError:
+                    st.error("❌ Cannot divide by zero!")
+                except (ArithmeticError, ValueError, TypeError) as e:
+                    st.error(f"❌ Cannot evaluate: {e}")
+            if result is not None:
+                st.markdown(f"""
+                <div class='result-box'>
+                    <p style='font-size:1.2rem; color: #000; word-break: break-all;'>{expression.strip()} = <b style='color:#4CAF50; font-size:1.5rem;'>{preview_result(result)}</b></p>
+                </div>
+                """, unsafe_allow_html=True)
+                if isinstance(result, int) and digit_count(result) > 2 * PREVIEW_DIGITS:
+                    st.caption(f"{digit_count(result):,} digits. Use 🔬 Precision to download the full value.")
+
+# Batch mode: the same calculation over every row of a table
+elif st.session_state.mode == MODES[2]:
+    st.subheader("📊 Batch Calculation")
+    uploaded = st.file_uploader("Upload a CSV or XLSX file:", type=["csv", "xlsx"])
+    pasted = ""
+    if uploaded is None:
+        pasted = st.text_area(
+            "...or paste columns (first line holds the column names):",
+            placeholder="price,quantity\n9.99,3\n4.50,0",
+            key="batch_paste"
+        )
+    
+    source = uploaded.file_id if uploaded is not None else pasted.strip()
+    if source:
+        # Parse once per upload/paste; reruns only redo the (vectorized) calculation
+        batch = st.session_state.batch
+        if batch is None or batch["source"] != source:
+            try:
+                batch = {"source": source, "frame": read_batch(uploaded, pasted)}
+            except (ValueError, KeyError, pd.errors.ParserError, zipfile.BadZipFile) as e:
+                # BadZipFile and KeyError come from corrupt or renamed .xlsx files
+                st.error(f"❌ Could not read the table: {e}")
+                batch = None
+            st.session_state.batch = batch
+    else:
+        batch = None
+    
+    if batch is not None and batch["frame"].shape[1]:
+        frame = batch["frame"]
+        columns = {column_variable(column): column for column in frame.columns}
+        st.write(f"**{len(frame):,} rows** · columns: " + ", ".join(f"`{name}`" for name in columns))
+        
+        how = st.radio("Calculate with:", ["Operation", "Expression"], horizontal=True, key="batch_how")
+        if how == "Operation":
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                first = st.selectbox("First column:", list(columns), key="batch_first")
+            with col2:
+                op_name = st.selectbox("Operation:", list(BATCH_OPERATIONS), key="batch_op")
+            with col3:
+                second = st.selectbox("Second column:", list(columns), index=min(1, len(columns) - 1), key="batch_second")
+            op_symbol, function = BATCH_OPERATIONS[op_name]
+            label = f"{first} {op_symbol} {second}"
+            evaluate = lambda variables: function(variables[first], variables[second])
+            error = None
+        else:
+            label = st.text_input("Expression:", placeholder=" * ".join(list(columns)[:2]), key="batch_expression").strip()
+            evaluate, error = None, None
+            if label:
+                try:
+                    evaluate, names = compile_expression(label)
+                    unknown = [name for name in names if name not in columns]
+                    if unknown:
+                        error = f"Unknown column: {', '.join(unknown)}"
+                except ValueError as e:
+                    error = str(e)
+        
+        if error:
+            st.error(f"❌ {error}")
+        elif evaluate is not None:
+            try:
+                values, undefined = calculate_batch(frame, evaluate, columns)
+            except (ArithmeticError, ValueError, TypeError) as e:
+                st.error(f"❌ Cannot evaluate: {e}")
+            else:
+                result = frame.assign(Result=values)
+                st.success(f"### ✅ Calculated `{label}` for {len(result):,} rows")
+                if undefined.any():
+                    rows_text = ", ".join(str(i + 1) for i in np.flatnonzero(undefined)[:10])
+                    more = " …" if undefined.sum() > 10 else ""
+                    st.warning(f"⚠️ {undefined.sum():,} rows have no result (division by zero, invalid input or out of range): rows {rows_text}{more}")
+                
+                st.dataframe(result.head(BATCH_PREVIEW_ROWS), use_container_width=True)
+                if len(result) > BATCH_PREVIEW_ROWS:
+                    st.caption(f"Showing the first {BATCH_PREVIEW_ROWS:,} rows; the download has all of them.")
+                # The CSV is only written when the button is clicked
+                st.download_button(
+                    "📥 Download Results (CSV)",
+                    data=lambda: batch_csv(result),
+                    file_name="batch_results.csv",
+                    mime="text/csv"
+                )
+
+# History: every past calculation, including ones from before "Start Over"
+elif st.session_state.mode == MODES[3]:
+    st.subheader("🕘 Calculation History")
+    history = get_history()
+    
+    search = st.text_input("Find an expression:", placeholder="2 + 3", key="history_search").strip()
+    if search:
+        matches = history.find(search)
+        if matches:
+            for entry in matches:
+                variables = f" (with {format_variables(entry['variables'])})" if entry["variables"] else ""
+                st.markdown(f"`{entry['expression']}`{variables} = **{entry['result']}** · {entry['timestamp']}")
+        else:
+            st.info(f"`{search}` has not been calculated yet")
+    
+    total = len(history)
+    if total == 0:
+        st.info("No calculations yet")
+    else:
+        pages = (total + HISTORY_PAGE_SIZE - 1) // HISTORY_PAGE_SIZE
+        page = st.number_input(f"Page (1-{pages}):", min_value=1, max_value=pages, value=1, step=1, key="history_page")
+        st.table([
+            {
+                "Expression": entry["expression"],
+                "Variables": format_variables(entry["variables"]),
+                "Result": entry["result"],
+                "Time": entry["timestamp"]
+            }
+            for entry in history.page(page)
+        ])
+        st.caption(f"{total:,} calculations, newest first")
+
+# Precision mode: exact big numbers, fractions and decimals
+elif st.session_state.mode == MODES[4]:
+    st.subheader("🔬 Precision")
+    expression = st.text_input("Expression:", placeholder="factorial(1000) / 3", key="precision_expression").strip()
+    col1, col2 = st.columns(2)
+    with col1:
+        number_type = st.radio("Numbers:", list(PRECISION_TYPES), horizontal=True, key="precision_type")
+    with col2:
+        precision = st.number_input(
+            "Significant digits (Decimal):", min_value=1, max_value=100_000, value=50, step=10,
+            key="precision_digits", disabled=number_type != "Decimal"
+        )
+    examples = "`1/3` or `0.1`" if PRECISION_TYPES[number_type] == "fraction" else "`0.1` or `1e-20`"
+    st.caption(
+        f"Functions: {', '.join(NUMBER_SYSTEMS[PRECISION_TYPES[number_type]]['functions'])}. "
+        f"Whole numbers are exact at any size; variables accept values like {examples}."
+    )
+    
+    if expression:
+        system = PRECISION_TYPES[number_type]
+        try:
+            evaluate, names = compile_expression(expression, system)
+        except ValueError as e:
+            st.error(f"❌ {e}")
+        else:
+            texts = {}
+            if names:
+                cols = st.columns(min(len(names), 4))
+                for i, name in enumerate(names):
+                    with cols[i % len(cols)]:
+                        texts[name] = st.text_input(f"{name} =", value="0", key=f"exact_{name}").strip()
+            
+            # Keep the last result, so reruns that change nothing skip the big-number work
+            key = (expression, system, precision if system == "decimal" else None, tuple(texts.items()))
+            cached = st.session_state.precision
+            if cached is None or cached["key"] != key:
+                cached = {"key": key, "value": None, "size": 0, "error": None}
+                try:
+                    with localcontext() as context:
+                        context.prec = precision
+                        variables = {name: parse_exact(text, system) for name, text in texts.items()}
+                        cached["value"] = evaluate(variables)
+                        cached["size"] = result_size(cached["value"])
+                except ZeroDivisionError:
+                    cached["error"] = "Cannot divide by zero!"
+                except (ArithmeticError, ValueError, TypeError) as e:
+                    cached["error"] = f"Cannot evaluate: {e}"
+                st.session_state.precision = cached
+            
+            if cached["error"]:
+                st.error(f"❌ {cached['error']}")
+            else:
+                value, size = cached["value"], cached["size"]
+                st.markdown(f"""
+                <div class='result-box'>
+                    <p style='font-size:1.2rem; color: #000; word-break: break-all;'>{expression} = <b style='color:#4CAF50; font-size:1.5rem;'>{preview_number(value)}</b></p>
+                </div>
+                """, unsafe_allow_html=True)
+                if isinstance(value, Fraction) and value.denominator != 1:
+                    with localcontext() as context:
+                        context.prec = PREVIEW_DIGITS
+                        st.markdown(f"≈ `{Decimal(value.numerator) / value.denominator}`")
+                if size > 2 * PREVIEW_DIGITS:
+                    st.caption(f"{size:,} digits. The full value is written only when downloaded.")
+                    st.download_button(
+                        "📥 Download Full Result",
+                        data=lambda: exact_text(value),
+                        file_name="result.txt",
+                        mime="text/plain"
+                    )
+
+# Statistics & matrices over pasted vectors and matrices
+elif st.session_state.mode == MODES[5]:
+    st.subheader("📐 Statistics & Matrices")
+    op_name = st.selectbox("Operation:", list(ARRAY_OPERATIONS), key="array_op")
+    needs_b, function = ARRAY_OPERATIONS[op_name]
+    
+    arrays = {}
+    cols = st.columns(2 if needs_b else 1)
+    for col, name in zip(cols, ["A", "B"]):
+        with col:
+            text = st.text_area(
+                f"{name}:",
+                placeholder="1, 2, 3" if name == "B" else "1 2\n3 4",
+                height=150,
+                key=f"array_{name}"
+            ).strip()
+        if not text:
+            continue
+        # Parse each input once; changing the operation reuses the cached array
+        cached = st.session_state.arrays.get(name)
+        if cached is None or cached["text"] != text:
+            try:
+                cached = {"text": text, "array": parse_array(text), "error": None}
+            except ValueError as e:
+                cached = {"text": text, "array": None, "error": f"{name}: {e}"}
+            st.session_state.arrays[name] = cached
+        if cached["error"]:
+            st.error(f"❌ {cached['error']}")
+        else:
+            arrays[name] = cached["array"]
+            col.caption(f"{name}: {describe_shape(cached['array'])}")
+    
+    percentiles = []
+    if op_name == "Percentiles":
+        percentile_text = st.text_input("Percentiles:", value="25, 50, 75", key="array_percentiles")
+        try:
+            percentiles = [float(value) for value in percentile_text.replace(",", " ").split()]
+        except ValueError:
+            percentiles = []
+        if not percentiles or not all(0 <= q <= 100 for q in percentiles):
+            percentiles = []
+            st.error("❌ Percentiles must be numbers between 0 and 100")
+    
+    if "A" in arrays and ("B" in arrays or not needs_b) and (percentiles or op_name != "Percentiles"):
+        try:
+            result = function(arrays["A"], arrays.get("B"), percentiles)
+        except np.linalg.LinAlgError as e:
+            st.error(f"❌ {e}")
+        except ValueError as e:
+            st.error(f"❌ Shapes do not fit: {e}")
+        else:
+            st.success(f"### ✅ {op_name}")
+            if np.ndim(result) == 0:
+                st.markdown(f"""
+                <div class='result-box'>
+                    <p style='font-size:1.2rem; color: #000;'><b style='color:#4CAF50; font-size:1.5rem;'>{result:g}</b></p>
+                </div>
+                """, unsafe_allow_html=True)
+            else:
+                table = pd.DataFrame(result)
+                if np.ndim(result) == 1:
+                    table.columns = ["Result"]
+                if op_name == "Percentiles":
+                    table.index = [f"P{q:g}" for q in percentiles]
+                st.dataframe(table, use_container_width=True)
+                st.download_button(
+                    "📥 Download Result (CSV)",
+                    data=lambda: table.to_csv(),
+                    file_name="array_result.csv",
+                    mime="text/csv"
+                )
 
 # Step 1: Name input
-if st.session_state.step == 1:
+elif st.session_state.step == 1:
     st.subheader("👋 Welcome!")
     name = st.text_input("Enter your name:", key="name_input")
     
@@ -152,6 +863,8 @@ elif st.session_state.step == 4:
         op_symbol = "÷"
     
     st.session_state.result = result
+    if not (operation == "divide" and num2 == 0):
+        get_history().record(f"{num1} {WIZARD_OPERATORS[operation]} {num2}", {}, result)
     
     # Display result
     st.success(f"### Result: `{num1}` {op_symbol} `{num2}` = **{result}**")
@@ -218,6 +931,9 @@ elif st.session_state.step == 5:
             final_result = result / num3
         op_symbol = "÷"
     
+    if not (operation == "divide" and num3 == 0):
+        get_history().record(f"{result} {WIZARD_OPERATORS[operation]} {num3}", {}, final_result)
+    
     # Display calculation history
     st.success("### ✅ Calculation Complete!")
     
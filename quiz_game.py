@@ -1,7 +1,25 @@
 import streamlit as st
 import pandas as pd
+from collections import Counter
 from datetime import datetime
+from io import BytesIO, TextIOWrapper
+from itertools import islice
+import hashlib
+import heapq
 import json
+import os
+import random
+import sqlite3
+import tempfile
+import textwrap
+import threading
+import time
+import uuid
+import pyarrow as pa
+import pyarrow.parquet as pq
+from openpyxl import Workbook
+from PIL import Image
+from sqlite_writer import BatchWriter
 
 # Page config
 st.set_page_config(
@@ -65,9 +83,52 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
+RESULT_COLUMNS = ['name', 'score', 'total', 'percentage', 'timestamp']
+EXPORT_CHUNK_ROWS = 10_000
+DEFAULT_NUMERIC_TOLERANCE = 0.01
+QUIZ_MODES = ["One question at a time", "All questions on one page", "Adaptive difficulty"]
+ADAPTIVE_QUIZ_LENGTH = 5
+ADAPTIVE_START_LEVEL = 2
+QUIZ_ID = "general-knowledge"
+# Adaptive attempts draw from QUESTION_BANK, so they are ranked separately
+ADAPTIVE_QUIZ_ID = "general-knowledge-adaptive"
+# Quiz id -> leaderboard title
+LEADERBOARD_QUIZZES = {QUIZ_ID: "Standard Quiz", ADAPTIVE_QUIZ_ID: "Adaptive Difficulty"}
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+ASSETS_DIR = os.path.join(APP_DIR, "assets")
+LEADERBOARD_DB = os.path.join(APP_DIR, "quiz_leaderboard.db")
+LEADERBOARD_SIZE = 10
+
 # Initialize session state
 if 'results' not in st.session_state:
-    st.session_state.results = []
+    # Keyed by attempt id; dicts keep insertion order, so this doubles as the history
+    st.session_state.results = {}
+if 'attempt_id' not in st.session_state:
+    st.session_state.attempt_id = None
+if 'stats' not in st.session_state:
+    # Running aggregates, updated once per saved result
+    st.session_state.stats = {
+        'count': 0,
+        'score_sum': 0,
+        'best_score': 0,
+        'histogram': {},
+        'player_best': {}
+    }
+if 'item_stats' not in st.session_state:
+    # Question text -> running per-question counters
+    st.session_state.item_stats = {}
+if 'results_table' not in st.session_state:
+    # Columnar copy of the summary fields, appended to as results are saved
+    st.session_state.results_table = {col: [] for col in RESULT_COLUMNS}
+if 'name_index' not in st.session_state:
+    # Normalized player name -> row positions in results_table
+    st.session_state.name_index = {}
+if 'frame_cache' not in st.session_state:
+    st.session_state.frame_cache = {'version': -1, 'table': None, 'chart': None}
+if 'export_cache' not in st.session_state:
+    # Export format -> (results version, anonymous temp file); the files are
+    # deleted when replaced or when the session is dropped
+    st.session_state.export_cache = {}
 if 'quiz_active' not in st.session_state:
     st.session_state.quiz_active = False
 if 'current_question' not in st.session_state:
@@ -76,8 +137,19 @@ if 'score' not in st.session_state:
     st.session_state.score = 0
 if 'answers' not in st.session_state:
     st.session_state.answers = []
+if 'question_started' not in st.session_state:
+    st.session_state.question_started = None
+if 'quiz_questions' not in st.session_state:
+    # Questions served so far in an adaptive attempt, indexed like current_question
+    st.session_state.quiz_questions = []
+if 'adaptive_queues' not in st.session_state:
+    st.session_state.adaptive_queues = {}
+if 'difficulty' not in st.session_state:
+    st.session_state.difficulty = ADAPTIVE_START_LEVEL
 if 'player_name' not in st.session_state:
     st.session_state.player_name = ""
+if 'quiz_mode' not in st.session_state:
+    st.session_state.quiz_mode = QUIZ_MODES[0]
 
 # Quiz questions
 QUESTIONS = [
@@ -88,6 +160,403 @@ QUESTIONS = [
     {"question": "What is the capital city of Pakistan?", "answer": "islamabad", "type": "text"}
 ]
 
+# Question bank for adaptive quizzes; difficulty runs from 1 (easy) to 3 (hard)
+QUESTION_BANK = [
+    {"question": "What is 2 - 2?", "answer": "0", "type": "number", "difficulty": 1},
+    {"question": "What is 5 + 13?", "answer": "18", "type": "number", "difficulty": 1},
+    {"question": "What is 3 ÷ 3?", "answer": "1", "type": "number", "difficulty": 1},
+    {"question": "What is 7 + 8?", "answer": "15", "type": "number", "difficulty": 1},
+    {"question": "How many days are in a week?", "answer": "7", "type": "number", "difficulty": 1},
+    {"question": "What color do you get by mixing blue and yellow?", "answer": "green", "type": "text", "difficulty": 1},
+    {"question": "What is 10 × 6?", "answer": "60", "type": "number", "difficulty": 2},
+    {"question": "What is the capital city of Pakistan?", "answer": "islamabad", "type": "text", "difficulty": 2},
+    {"question": "What is 144 ÷ 12?", "answer": "12", "type": "number", "difficulty": 2},
+    {"question": "What is 15% of 200?", "answer": "30", "type": "number", "difficulty": 2},
+    {"question": "Which planet is known as the Red Planet?", "answer": "mars", "type": "text", "difficulty": 2},
+    {"question": "What is the square root of 169?", "answer": "13", "type": "number", "difficulty": 2},
+    {"question": "What is 17 × 23?", "answer": "391", "type": "number", "difficulty": 3},
+    {"question": "What is 2 to the power of 10?", "answer": "1024", "type": "number", "difficulty": 3},
+    {"question": "What is the chemical symbol for gold?", "answer": "au", "type": "text", "difficulty": 3},
+    {"question": "How many sides does a dodecagon have?", "answer": "12", "type": "number", "difficulty": 3},
+    {"question": "What is the largest prime number below 100?", "answer": "97", "type": "number", "difficulty": 3},
+    {"question": "Who wrote the poem 'Lab Pe Aati Hai Dua'?", "answer": "allama iqbal", "type": "text", "difficulty": 3}
+]
+
+# Difficulty level -> bank indices, built once so picking a question never scans the bank
+DIFFICULTY_BUCKETS = {}
+for _index, _question in enumerate(QUESTION_BANK):
+    DIFFICULTY_BUCKETS.setdefault(_question['difficulty'], []).append(_index)
+DIFFICULTY_LEVELS = sorted(DIFFICULTY_BUCKETS)
+
+# Adaptive question selection
+def start_adaptive_quiz():
+    st.session_state.quiz_questions = []
+    st.session_state.difficulty = ADAPTIVE_START_LEVEL
+    # One shuffled queue per level; popping from the end is O(1) and never repeats a question
+    st.session_state.adaptive_queues = {
+        level: random.sample(indices, len(indices)) for level, indices in DIFFICULTY_BUCKETS.items()
+    }
+
+def next_difficulty(level, score, answered):
+    """Step the level up or down based on the player's running accuracy."""
+    if answered == 0:
+        return level
+    accuracy = score / answered
+    if accuracy >= 0.75:
+        return min(level + 1, DIFFICULTY_LEVELS[-1])
+    if accuracy < 0.5:
+        return max(level - 1, DIFFICULTY_LEVELS[0])
+    return level
+
+def pick_adaptive_question(level):
+    queues = st.session_state.adaptive_queues
+    # Fall back to the nearest level that still has unused questions
+    for candidate in sorted(DIFFICULTY_LEVELS, key=lambda l: abs(l - level)):
+        if queues[candidate]:
+            return QUESTION_BANK[queues[candidate].pop()]
+    return None
+
+def quiz_length():
+    if st.session_state.quiz_mode == QUIZ_MODES[2]:
+        return min(ADAPTIVE_QUIZ_LENGTH, len(QUESTION_BANK))
+    return len(QUESTIONS)
+
+def question_for(q_num):
+    """Return question q_num of the current attempt, choosing it on first request in adaptive mode."""
+    if st.session_state.quiz_mode != QUIZ_MODES[2]:
+        return QUESTIONS[q_num]
+    served = st.session_state.quiz_questions
+    if len(served) <= q_num:
+        level = next_difficulty(st.session_state.difficulty, st.session_state.score, len(st.session_state.answers))
+        st.session_state.difficulty = level
+        served.append(pick_adaptive_question(level))
+    return served[q_num]
+
+# Bundled images
+@st.cache_resource
+def load_image(name, width):
+    """Decode a bundled image once and return it as PNG bytes at its display width."""
+    with Image.open(os.path.join(ASSETS_DIR, name)) as image:
+        height = round(image.height * width / image.width)
+        resized = image.convert("RGBA").resize((width, height), Image.LANCZOS)
+    buffer = BytesIO()
+    resized.save(buffer, format="PNG", optimize=True)
+    return buffer.getvalue()
+
+# Shared leaderboard
+class Leaderboard:
+    """Top-k attempts per quiz, shared by every session and persisted to SQLite.
+
+    Each quiz keeps a min-heap of at most `size` entries, so submitting is
+    O(log k) and reading the top entries never touches the full history.
+    Inserts are queued and written in batches by a background thread, which
+    keeps disk I/O off the script thread.
+    """
+    
+    def __init__(self, path, size):
+        self.path = path
+        self.size = size
+        self.lock = threading.Lock()
+        self.heaps = {}
+        
+        conn = sqlite3.connect(path)
+        with conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS leaderboard (
+                    quiz TEXT, name TEXT, score INTEGER, total INTEGER,
+                    percentage REAL, timestamp TEXT, created_ns INTEGER
+                )
+            """)
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS leaderboard_rank "
+                "ON leaderboard (quiz, percentage DESC, created_ns)"
+            )
+        quizzes = [row[0] for row in conn.execute("SELECT DISTINCT quiz FROM leaderboard")]
+        for quiz in quizzes:
+            rows = conn.execute(
+                "SELECT percentage, created_ns, name, score, total, timestamp FROM leaderboard "
+                "WHERE quiz = ? ORDER BY percentage DESC, created_ns LIMIT ?",
+                (quiz, size)
+            )
+            heap = [(percentage, -created_ns, name, score, total, timestamp)
+                    for percentage, created_ns, name, score, total, timestamp in rows]
+            heapq.heapify(heap)
+            self.heaps[quiz] = heap
+        conn.close()
+        
+        self.writer = BatchWriter(path, "INSERT INTO leaderboard VALUES (?, ?, ?, ?, ?, ?, ?)")
+    
+    def submit(self, quiz, results):
+        rows = []
+        with self.lock:
+            heap = self.heaps.setdefault(quiz, [])
+            for result in results:
+                created_ns = time.time_ns()
+                entry = (result['percentage'], -created_ns, result['name'],
+                         result['score'], result['total'], result['timestamp'])
+                if len(heap) < self.size:
+                    heapq.heappush(heap, entry)
+                elif entry > heap[0]:
+                    heapq.heapreplace(heap, entry)
+                rows.append((quiz, result['name'], result['score'], result['total'],
+                             result['percentage'], result['timestamp'], created_ns))
+        self.writer.put(rows)
+    
+    def top(self, quiz, n=None):
+        with self.lock:
+            entries = sorted(self.heaps.get(quiz, []), reverse=True)
+        return [
+            {'name': name, 'score': score, 'total': total, 'percentage': percentage, 'timestamp': timestamp}
+            for percentage, _, name, score, total, timestamp in entries[:n]
+        ]
+    
+    def close(self):
+        """Flush queued rows and stop the writer."""
+        self.writer.close()
+
+@st.cache_resource
+def get_leaderboard():
+    return Leaderboard(LEADERBOARD_DB, LEADERBOARD_SIZE)
+
+# Result store helpers
+def new_attempt_id():
+    return uuid.uuid4().hex
+
+def save_result(result):
+    """Store a finished attempt once; reruns of the completion screen are no-ops."""
+    return save_results([result]) == 1
+
+def save_results(results):
+    """Store each attempt whose id is not already saved; returns how many were added."""
+    store = st.session_state.results
+    stats = st.session_state.stats
+    item_stats = st.session_state.item_stats
+    table = st.session_state.results_table
+    name_index = st.session_state.name_index
+    saved = []
+    for result in results:
+        if result['id'] in store:
+            continue
+        store[result['id']] = result
+        update_stats(stats, result)
+        update_item_stats(item_stats, result)
+        index_result(table, name_index, result)
+        saved.append(result)
+    # Each quiz has its own leaderboard
+    by_quiz = {}
+    for result in saved:
+        by_quiz.setdefault(result.get('quiz', QUIZ_ID), []).append(result)
+    leaderboard = get_leaderboard()
+    for quiz, quiz_results in by_quiz.items():
+        leaderboard.submit(quiz, quiz_results)
+    return len(saved)
+
+def normalize_name(name):
+    return " ".join(name.split()).lower()
+
+def update_stats(stats, result):
+    score = result['score']
+    stats['count'] += 1
+    stats['score_sum'] += score
+    stats['best_score'] = max(stats['best_score'], score)
+    stats['histogram'][score] = stats['histogram'].get(score, 0) + 1
+    player = normalize_name(result['name'])
+    stats['player_best'][player] = max(stats['player_best'].get(player, 0), score)
+
+def update_item_stats(item_stats, result):
+    for answer in result['answers']:
+        item = item_stats.get(answer['question'])
+        if item is None:
+            item = item_stats[answer['question']] = {
+                'attempts': 0,
+                'correct': 0,
+                'wrong_answers': Counter(),
+                'timed': 0,
+                'seconds': 0.0
+            }
+        item['attempts'] += 1
+        if answer['is_correct']:
+            item['correct'] += 1
+        else:
+            item['wrong_answers'][answer['user_answer'].lower()] += 1
+        # Only the question-by-question mode times individual answers
+        seconds = answer.get('seconds')
+        if seconds is not None:
+            item['timed'] += 1
+            item['seconds'] += seconds
+
+def index_result(table, name_index, result):
+    row = len(table['name'])
+    for col in RESULT_COLUMNS:
+        table[col].append(result[col])
+    name_index.setdefault(normalize_name(result['name']), []).append(row)
+
+def results_frames():
+    """Return the (table, chart) DataFrames, rebuilt only after new results are saved."""
+    cache = st.session_state.frame_cache
+    version = st.session_state.stats['count']
+    if cache['version'] != version:
+        table = pd.DataFrame(st.session_state.results_table, columns=RESULT_COLUMNS)
+        chart = pd.DataFrame(
+            {'Score': table['score'].to_numpy()},
+            index=pd.RangeIndex(1, len(table) + 1, name='Attempt')
+        )
+        cache.update(version=version, table=table, chart=chart)
+    return cache['table'], cache['chart']
+
+def search_rows(query):
+    """Row positions whose player name contains query, scanning distinct names only."""
+    query = normalize_name(query)
+    index = st.session_state.name_index
+    rows = [row for name, name_rows in index.items() if query in name for row in name_rows]
+    rows.sort()
+    return rows
+
+# Bulk grading helpers
+def sheet_columns():
+    return [f"q{i + 1}" for i in range(len(QUESTIONS))]
+
+def grade_answers(given, question, tolerance=DEFAULT_NUMERIC_TOLERANCE):
+    """Boolean Series marking which answers in `given` are correct for one question.
+
+    Every quiz mode grades through this, so whitespace, case and numeric
+    tolerance are treated the same whichever way the quiz was taken.
+    """
+    given = given.str.strip()
+    if question['type'] == 'number':
+        numeric = pd.to_numeric(given, errors='coerce')
+        return (numeric - float(question['answer'])).abs() <= tolerance
+    normalized = given.str.replace(r'\s+', ' ', regex=True).str.lower()
+    return normalized == question['answer'].lower()
+
+def grade_answer(answer, question):
+    return bool(grade_answers(pd.Series([answer], dtype=str), question).iloc[0])
+
+def grade_sheets(sheet, tolerance):
+    """Grade every answer sheet at once; returns a boolean frame with one column per question."""
+    correct = {
+        col: grade_answers(sheet[col], question, tolerance)
+        for col, question in zip(sheet_columns(), QUESTIONS)
+    }
+    return pd.DataFrame(correct, index=sheet.index)
+
+def sheet_batch_id(uploaded):
+    """Attempt-id prefix derived from the file's content, so re-grading the same CSV saves nothing new."""
+    return hashlib.sha256(uploaded.getvalue()).hexdigest()[:16]
+
+def save_graded_sheets(sheet, correct, batch_id):
+    """Write graded sheets into the results store as one attempt per row.
+
+    Ids are the batch id plus the row's position in the uploaded file.
+    Returns the scores and how many sheets were newly saved.
+    """
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    total = len(QUESTIONS)
+    columns = sheet_columns()
+    scores = correct.sum(axis=1).to_numpy()
+    rows = zip(
+        sheet['name'].str.strip(),
+        scores,
+        sheet[columns].itertuples(index=False, name=None),
+        correct[columns].itertuples(index=False, name=None)
+    )
+    added = save_results(
+        {
+            'id': f"{batch_id}-{i}",
+            'quiz': QUIZ_ID,
+            'name': name,
+            'score': int(score),
+            'total': total,
+            'percentage': int(score) / total * 100,
+            'timestamp': timestamp,
+            'answers': [
+                {
+                    'question': question['question'],
+                    'user_answer': answer.strip(),
+                    'correct_answer': question['answer'],
+                    'is_correct': bool(ok)
+                }
+                for question, answer, ok in zip(QUESTIONS, given, is_correct)
+            ]
+        }
+        for i, (name, score, given, is_correct) in zip(sheet.index, rows)
+    )
+    return scores, added
+
+# Export writers: each streams the snapshot into a binary file object in chunks of EXPORT_CHUNK_ROWS
+def write_csv(fileobj, table, results):
+    f = TextIOWrapper(fileobj, encoding='utf-8', newline='')
+    for start in range(0, len(table), EXPORT_CHUNK_ROWS):
+        chunk = table.iloc[start:start + EXPORT_CHUNK_ROWS]
+        chunk.to_csv(f, header=start == 0, index=False)
+    # Flush and hand the file back without closing it
+    f.detach()
+
+def write_json(fileobj, table, results):
+    f = TextIOWrapper(fileobj, encoding='utf-8')
+    f.write('[')
+    for i, result in enumerate(results):
+        f.write(',\n' if i else '\n')
+        f.write(textwrap.indent(json.dumps(result, indent=2), '  '))
+    f.write('\n]')
+    f.detach()
+
+def write_parquet(fileobj, table, results):
+    schema = pa.Schema.from_pandas(table.head(EXPORT_CHUNK_ROWS), preserve_index=False)
+    with pq.ParquetWriter(fileobj, schema) as writer:
+        for start in range(0, len(table), EXPORT_CHUNK_ROWS):
+            chunk = table.iloc[start:start + EXPORT_CHUNK_ROWS]
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+
+def write_xlsx(fileobj, table, results):
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Results")
+    sheet.append(RESULT_COLUMNS)
+    for row in table.itertuples(index=False, name=None):
+        sheet.append(row)
+    workbook.save(fileobj)
+
+# Format -> (extension, mime type, writer)
+EXPORT_FORMATS = {
+    'CSV': ('csv', 'text/csv', write_csv),
+    'JSON': ('json', 'application/json', write_json),
+    'Parquet': ('parquet', 'application/vnd.apache.parquet', write_parquet),
+    'XLSX': ('xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', write_xlsx)
+}
+
+def export_builder(fmt):
+    """Return a callable that writes the export on click, reusing it until results change.
+
+    Streamlit runs the callable off the script thread, so everything it needs is
+    captured here rather than read from st.session_state.
+    """
+    table, _ = results_frames()
+    version = st.session_state.stats['count']
+    # A snapshot of references: results saved during a download can't change it
+    results = list(islice(st.session_state.results.values(), version))
+    cache = st.session_state.export_cache
+    _, _, writer = EXPORT_FORMATS[fmt]
+    
+    def build():
+        cached = cache.get(fmt)
+        if cached is None or cached[0] != version:
+            # Anonymous temp files are removed by the OS once closed, so nothing
+            # is left behind when a session ends
+            fileobj = tempfile.TemporaryFile()
+            writer(fileobj, table, results)
+            if cached is not None:
+                cached[1].close()
+            cached = cache[fmt] = (version, fileobj)
+        cached[1].seek(0)
+        return cached[1].read()
+    
+    return build
+
+def recent_results(n):
+    """Return the last n attempts, oldest first, without copying the whole history."""
+    return list(islice(reversed(st.session_state.results.values()), n))[::-1]
+
 # Header
 col1, col2, col3 = st.columns([1, 2, 1])
 with col2:
@@ -96,14 +565,15 @@ with col2:
 
 # Sidebar
 with st.sidebar:
-    st.image("https://img.icons8.com/fluency/96/000000/brain.png", width=100)
+    st.image(load_image("brain.png", 100), width=100)
     st.markdown("## 📊 Dashboard")
     
     # Stats
-    total_attempts = len(st.session_state.results)
+    stats = st.session_state.stats
+    total_attempts = stats['count']
     if total_attempts > 0:
-        avg_score = sum([r['score'] for r in st.session_state.results]) / total_attempts
-        best_score = max([r['score'] for r in st.session_state.results])
+        avg_score = stats['score_sum'] / total_attempts
+        best_score = stats['best_score']
     else:
         avg_score = 0
         best_score = 0
@@ -116,7 +586,7 @@ with st.sidebar:
     st.markdown("### 🎮 Navigation")
     menu_option = st.radio(
         "Choose an option:",
-        ["🏠 Home", "📝 Start Quiz", "📈 View Results", "🔍 Search Results", "💾 Download Results"],
+        ["🏠 Home", "📝 Start Quiz", "📋 Bulk Grading", "🏆 Leaderboard", "🧩 Question Analytics", "📈 View Results", "🔍 Search Results", "💾 Download Results"],
         label_visibility="collapsed"
     )
 
@@ -132,7 +602,9 @@ if menu_option == "🏠 Home":
         Test your knowledge with our exciting quiz! Here's what you can do:
         
         - ✅ Take interactive quizzes
+        - 📋 Grade a whole class from an answer-sheet CSV
         - 📊 Track your performance
+        - 🏆 Compare scores on the class leaderboard
         - 🔍 Search your past attempts
         - 💾 Download your results
         
@@ -140,11 +612,11 @@ if menu_option == "🏠 Home":
         """)
     
     with col2:
-        st.image("https://img.icons8.com/color/200/000000/quiz.png")
+        st.image(load_image("quiz.png", 200), width=200)
     
     if st.session_state.results:
         st.markdown("### 🏆 Recent Attempts")
-        recent_df = pd.DataFrame(st.session_state.results[-5:])
+        recent_df = pd.DataFrame(recent_results(5))
         recent_df = recent_df[['name', 'score', 'timestamp']]
         st.dataframe(recent_df, use_container_width=True, hide_index=True)
     
@@ -157,15 +629,21 @@ elif menu_option == "📝 Start Quiz":
         
         with st.form("start_quiz_form"):
             player_name = st.text_input("Enter your name:", placeholder="Your name here...")
+            quiz_mode = st.radio("Quiz mode:", QUIZ_MODES, horizontal=True)
             submit = st.form_submit_button("🚀 Start Quiz", use_container_width=True)
             
             if submit:
                 if player_name.strip():
                     st.session_state.player_name = player_name.strip()
+                    st.session_state.quiz_mode = quiz_mode
+                    st.session_state.attempt_id = new_attempt_id()
                     st.session_state.quiz_active = True
                     st.session_state.current_question = 0
                     st.session_state.score = 0
                     st.session_state.answers = []
+                    st.session_state.question_started = time.time()
+                    if quiz_mode == QUIZ_MODES[2]:
+                        start_adaptive_quiz()
                     st.rerun()
                 else:
                     st.error("⚠️ Please enter your name!")
@@ -173,15 +651,58 @@ elif menu_option == "📝 Start Quiz":
         st.markdown('</div>', unsafe_allow_html=True)
     
     else:
-        # Quiz in progress
-        if st.session_state.current_question < len(QUESTIONS):
+        # Quiz in progress, all questions in a single form
+        if st.session_state.current_question < len(QUESTIONS) and st.session_state.quiz_mode == QUIZ_MODES[1]:
+            st.markdown(f"**{len(QUESTIONS)} questions**")
+            st.markdown('<div class="quiz-container">', unsafe_allow_html=True)
+            
+            with st.form("all_questions_form"):
+                given = []
+                for i, question in enumerate(QUESTIONS):
+                    st.markdown(f"### {i + 1}. {question['question']}")
+                    placeholder = "Enter number..." if question['type'] == 'number' else "Enter your answer..."
+                    given.append(st.text_input(
+                        "Your answer:",
+                        placeholder=placeholder,
+                        key=f"answer_{st.session_state.attempt_id}_{i}"
+                    ))
+                
+                submitted = st.form_submit_button("✅ Submit All Answers", use_container_width=True)
+                
+                if submitted:
+                    missing = [str(i + 1) for i, answer in enumerate(given) if not answer.strip()]
+                    if missing:
+                        st.warning(f"⚠️ Please answer question(s) {', '.join(missing)}!")
+                    else:
+                        # Grade the whole attempt in one pass with the bulk grader
+                        sheet = pd.DataFrame([given], columns=sheet_columns())
+                        correct = grade_sheets(sheet, DEFAULT_NUMERIC_TOLERANCE).iloc[0]
+                        st.session_state.answers = [
+                            {
+                                'question': question['question'],
+                                'user_answer': answer.strip(),
+                                'correct_answer': question['answer'],
+                                'is_correct': bool(ok)
+                            }
+                            for question, answer, ok in zip(QUESTIONS, given, correct)
+                        ]
+                        st.session_state.score = int(correct.sum())
+                        st.session_state.current_question = len(QUESTIONS)
+                        st.rerun()
+            
+            st.markdown('</div>', unsafe_allow_html=True)
+        
+        # Quiz in progress, one question per form
+        elif st.session_state.current_question < quiz_length():
             q_num = st.session_state.current_question
-            question = QUESTIONS[q_num]
+            question = question_for(q_num)
             
             # Progress bar
-            progress = (q_num) / len(QUESTIONS)
+            progress = (q_num) / quiz_length()
             st.progress(progress)
-            st.markdown(f"**Question {q_num + 1} of {len(QUESTIONS)}**")
+            st.markdown(f"**Question {q_num + 1} of {quiz_length()}**")
+            if 'difficulty' in question:
+                st.markdown(f"Difficulty: {'⭐' * question['difficulty']}")
             
             st.markdown('<div class="quiz-container">', unsafe_allow_html=True)
             st.markdown(f"### {question['question']}")
@@ -197,7 +718,7 @@ elif menu_option == "📝 Start Quiz":
                 if submitted:
                     if user_answer.strip():
                         correct_answer = question['answer']
-                        is_correct = user_answer.strip().lower() == correct_answer.lower()
+                        is_correct = grade_answer(user_answer, question)
                         
                         if is_correct:
                             st.session_state.score += 1
@@ -205,14 +726,17 @@ elif menu_option == "📝 Start Quiz":
                         else:
                             st.error(f"❌ Wrong! Correct answer: {correct_answer.title()}")
                         
+                        now = time.time()
                         st.session_state.answers.append({
                             'question': question['question'],
                             'user_answer': user_answer.strip(),
                             'correct_answer': correct_answer,
-                            'is_correct': is_correct
+                            'is_correct': is_correct,
+                            'seconds': round(now - st.session_state.question_started, 2)
                         })
                         
                         st.session_state.current_question += 1
+                        st.session_state.question_started = now
                         st.rerun()
                     else:
                         st.warning("⚠️ Please enter an answer!")
@@ -222,11 +746,13 @@ elif menu_option == "📝 Start Quiz":
         else:
             # Quiz completed
             score = st.session_state.score
-            total = len(QUESTIONS)
+            total = quiz_length()
             percentage = (score / total) * 100
             
             # Save result
             result = {
+                'id': st.session_state.attempt_id,
+                'quiz': ADAPTIVE_QUIZ_ID if st.session_state.quiz_mode == QUIZ_MODES[2] else QUIZ_ID,
                 'name': st.session_state.player_name,
                 'score': score,
                 'total': total,
@@ -235,14 +761,15 @@ elif menu_option == "📝 Start Quiz":
                 'answers': st.session_state.answers
             }
             
-            if result not in st.session_state.results:
-                st.session_state.results.append(result)
+            save_result(result)
             
             # Display results
             st.markdown('<div class="score-card">', unsafe_allow_html=True)
             st.markdown(f"# 🎉 Quiz Completed!")
             st.markdown(f"## {st.session_state.player_name}")
             st.markdown(f"### Score: {score}/{total} ({percentage:.0f}%)")
+            personal_best = st.session_state.stats['player_best'].get(normalize_name(st.session_state.player_name), score)
+            st.markdown(f"Personal best: {personal_best}/{total}")
             st.markdown('</div>', unsafe_allow_html=True)
             
             # Feedback
@@ -283,15 +810,146 @@ elif menu_option == "📝 Start Quiz":
             
             st.markdown('</div>', unsafe_allow_html=True)
 
+elif menu_option == "📋 Bulk Grading":
+    st.markdown('<div class="quiz-container">', unsafe_allow_html=True)
+    st.markdown("## 📋 Bulk Answer-Sheet Grading")
+    
+    columns = sheet_columns()
+    st.markdown(f"Upload a CSV with a `name` column and one answer column per question: `{'`, `'.join(columns)}`.")
+    st.download_button(
+        label="📄 Download Template",
+        data=",".join(['name'] + columns) + "\n",
+        file_name="answer_sheet_template.csv",
+        mime="text/csv"
+    )
+    
+    with st.form("bulk_grading_form"):
+        uploaded = st.file_uploader("Answer sheets (CSV)", type=["csv"])
+        tolerance = st.number_input(
+            "Numeric tolerance:",
+            min_value=0.0,
+            value=DEFAULT_NUMERIC_TOLERANCE,
+            step=0.01,
+            format="%.4f"
+        )
+        grade = st.form_submit_button("🧮 Grade Sheets", use_container_width=True)
+    
+    if grade:
+        if uploaded is None:
+            st.warning("⚠️ Please upload a CSV file!")
+        else:
+            try:
+                sheet = pd.read_csv(uploaded, dtype=str, keep_default_na=False)
+            except (pd.errors.ParserError, UnicodeDecodeError, ValueError) as e:
+                st.error(f"❌ Could not read the CSV file: {e}")
+                sheet = None
+            
+            if sheet is not None:
+                sheet.columns = sheet.columns.str.strip().str.lower()
+                missing = [col for col in ['name'] + columns if col not in sheet.columns]
+                
+                if missing:
+                    st.error(f"❌ Missing column(s): {', '.join(missing)}")
+                else:
+                    blank = sheet['name'].str.strip() == ''
+                    if blank.any():
+                        st.warning(f"⚠️ Skipped {int(blank.sum())} sheet(s) without a name.")
+                        sheet = sheet[~blank]
+                    
+                    started = datetime.now()
+                    correct = grade_sheets(sheet, tolerance)
+                    scores, added = save_graded_sheets(sheet, correct, sheet_batch_id(uploaded))
+                    elapsed = (datetime.now() - started).total_seconds()
+                    
+                    if len(scores):
+                        st.success(f"✅ Graded {len(scores)} sheet(s) in {elapsed:.2f}s")
+                        if added < len(scores):
+                            st.info(f"ℹ️ {len(scores) - added} sheet(s) in this file were already graded and were not saved again.")
+                        col1, col2, col3 = st.columns(3)
+                        col1.metric("Sheets", len(scores))
+                        col2.metric("Average Score", f"{scores.mean():.1f}/{len(QUESTIONS)}")
+                        col3.metric("Perfect Scores", int((scores == len(QUESTIONS)).sum()))
+                        
+                        st.markdown("### ✅ Percent Correct by Question")
+                        st.bar_chart(correct.mean() * 100)
+                    else:
+                        st.info("📭 No answer sheets to grade.")
+    
+    st.markdown('</div>', unsafe_allow_html=True)
+
+elif menu_option == "🏆 Leaderboard":
+    st.markdown('<div class="quiz-container">', unsafe_allow_html=True)
+    st.markdown(f"## 🏆 Top {LEADERBOARD_SIZE} Leaderboard")
+    
+    quiz = st.radio(
+        "Quiz:",
+        list(LEADERBOARD_QUIZZES),
+        format_func=LEADERBOARD_QUIZZES.get,
+        horizontal=True
+    )
+    leaders = get_leaderboard().top(quiz)
+    if leaders:
+        leaders_df = pd.DataFrame(leaders, columns=RESULT_COLUMNS)
+        leaders_df.index = pd.RangeIndex(1, len(leaders_df) + 1, name='Rank')
+        st.dataframe(
+            leaders_df,
+            use_container_width=True,
+            column_config={
+                "name": "Name",
+                "score": st.column_config.NumberColumn("Score", format="%d"),
+                "total": st.column_config.NumberColumn("Total", format="%d"),
+                "percentage": st.column_config.ProgressColumn("Performance", format="%.1f%%", min_value=0, max_value=100),
+                "timestamp": "Date & Time"
+            }
+        )
+    else:
+        st.info("📭 No scores on the leaderboard yet. Be the first!")
+    
+    st.markdown('</div>', unsafe_allow_html=True)
+
+elif menu_option == "🧩 Question Analytics":
+    st.markdown('<div class="quiz-container">', unsafe_allow_html=True)
+    st.markdown("## 🧩 Question Analytics")
+    
+    item_stats = st.session_state.item_stats
+    if item_stats:
+        rows = []
+        for question, item in item_stats.items():
+            common_wrong = ", ".join(
+                f"{answer or '(blank)'} ({count})" for answer, count in item['wrong_answers'].most_common(3)
+            )
+            rows.append({
+                'question': question,
+                'attempts': item['attempts'],
+                'percent_correct': item['correct'] / item['attempts'] * 100,
+                'avg_seconds': item['seconds'] / item['timed'] if item['timed'] else None,
+                'common_wrong': common_wrong or "-"
+            })
+        
+        st.dataframe(
+            pd.DataFrame(rows),
+            use_container_width=True,
+            hide_index=True,
+            column_config={
+                "question": "Question",
+                "attempts": st.column_config.NumberColumn("Attempts", format="%d"),
+                "percent_correct": st.column_config.ProgressColumn("Answered Correctly", format="%.1f%%", min_value=0, max_value=100),
+                "avg_seconds": st.column_config.NumberColumn("Avg Time (s)", format="%.1f"),
+                "common_wrong": "Most Common Wrong Answers"
+            }
+        )
+    else:
+        st.info("📭 No answers yet. Take a quiz to see question analytics!")
+    
+    st.markdown('</div>', unsafe_allow_html=True)
+
 elif menu_option == "📈 View Results":
     st.markdown('<div class="quiz-container">', unsafe_allow_html=True)
     st.markdown("## 📈 All Results")
     
     if st.session_state.results:
-        # Convert to DataFrame
-        df = pd.DataFrame(st.session_state.results)
-        df = df[['name', 'score', 'total', 'percentage', 'timestamp']]
-        df['percentage'] = df['percentage'].round(1)
+        # Cached columnar table; the progress column handles rounding for display
+        df, chart_data = results_frames()
         
         st.dataframe(
             df,
@@ -308,11 +966,16 @@ elif menu_option == "📈 View Results":
         
         # Visualization
         st.markdown("### 📊 Performance Chart")
-        chart_data = pd.DataFrame({
-            'Attempt': range(1, len(st.session_state.results) + 1),
-            'Score': [r['score'] for r in st.session_state.results]
+        st.line_chart(chart_data)
+        
+        st.markdown("### 📊 Score Distribution")
+        histogram = st.session_state.stats['histogram']
+        scores = sorted(histogram)
+        dist_data = pd.DataFrame({
+            'Score': scores,
+            'Attempts': [histogram[s] for s in scores]
         })
-        st.line_chart(chart_data.set_index('Attempt'))
+        st.bar_chart(dist_data.set_index('Score'))
     else:
         st.info("📭 No results yet. Take a quiz to see your results!")
     
@@ -326,13 +989,12 @@ elif menu_option == "🔍 Search Results":
         search_name = st.text_input("Enter name to search:", placeholder="Search by name...")
         
         if search_name:
-            filtered = [r for r in st.session_state.results if search_name.lower() in r['name'].lower()]
+            rows = search_rows(search_name)
             
-            if filtered:
-                st.success(f"Found {len(filtered)} result(s) for '{search_name}'")
-                df = pd.DataFrame(filtered)
-                df = df[['name', 'score', 'total', 'percentage', 'timestamp']]
-                df['percentage'] = df['percentage'].round(1)
+            if rows:
+                st.success(f"Found {len(rows)} result(s) for '{search_name}'")
+                table, _ = results_frames()
+                df = table.iloc[rows]
                 
                 st.dataframe(
                     df,
@@ -358,33 +1020,20 @@ elif menu_option == "💾 Download Results":
     st.markdown("## 💾 Download Results")
     
     if st.session_state.results:
-        # Prepare download data
-        df = pd.DataFrame(st.session_state.results)
-        df = df[['name', 'score', 'total', 'percentage', 'timestamp']]
+        # Files are generated only when a button is clicked
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        cols = st.columns(2)
         
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            # CSV Download
-            csv = df.to_csv(index=False)
-            st.download_button(
-                label="📥 Download CSV",
-                data=csv,
-                file_name=f"quiz_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-                mime="text/csv",
-                use_container_width=True
-            )
-        
-        with col2:
-            # JSON Download
-            json_data = json.dumps(st.session_state.results, indent=2)
-            st.download_button(
-                label="📥 Download JSON",
-                data=json_data,
-                file_name=f"quiz_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
-                mime="application/json",
-                use_container_width=True
-            )
+        for i, (fmt, (ext, mime, _)) in enumerate(EXPORT_FORMATS.items()):
+            with cols[i % 2]:
+                st.download_button(
+                    label=f"📥 Download {fmt}",
+                    data=export_builder(fmt),
+                    file_name=f"quiz_results_{timestamp}.{ext}",
+                    mime=mime,
+                    key=f"download_{ext}",
+                    use_container_width=True
+                )
         
         st.success("✅ Your results are ready to download!")
     else:
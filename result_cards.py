@@ -0,0 +1,154 @@
+"""Printable result cards for academy_calc.py.
+
+Cards are drawn with Pillow and can be rendered for a whole class across a
+process pool. This lives outside the Streamlit script because pool workers
+have to import the renderer, and importing the app would run its page code.
+
+Run it directly for a cards-per-second benchmark against worker count:
+
+    python result_cards.py --cards 2000 --format png
+"""
+import argparse
+import multiprocessing
+import os
+import re
+import tempfile
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+
+from PIL import Image, ImageDraw, ImageFont
+
+CARD_SIZE = (800, 1000)
+# Extension -> (Pillow format, save options); fast PNG compression keeps encoding from dominating
+CARD_FORMATS = {"png": ("PNG", {"compress_level": 1}), "pdf": ("PDF", {"resolution": 100.0})}
+BACKGROUND = "#1a1a2e"
+ACCENT = "#2196F3"
+LIGHT_ACCENT = "#64b5f6"
+
+_fonts = {}
+
+def _font(size):
+    # Loading a FreeType font is slow enough to matter per card, so keep one per size
+    if size not in _fonts:
+        _fonts[size] = ImageFont.load_default(size=size)
+    return _fonts[size]
+
+def render_card(card, fmt="png"):
+    """Draw one student's result card and return it encoded as PNG or PDF bytes.
+
+    `card` holds name, grade, percentage, total, max_total and subjects, a
+    list of (name, marks, max_marks) tuples.
+    """
+    width, height = CARD_SIZE
+    image = Image.new("RGB", CARD_SIZE, BACKGROUND)
+    draw = ImageDraw.Draw(image)
+
+    draw.text((width // 2, 60), "Academic Result Card", font=_font(40), fill="white", anchor="mm")
+    draw.text((width // 2, 115), card["name"], font=_font(32), fill=LIGHT_ACCENT, anchor="mm")
+
+    # Grade panel
+    draw.rounded_rectangle([60, 160, width - 60, 400], radius=24, fill=ACCENT, outline=LIGHT_ACCENT, width=4)
+    draw.text((width // 2, 200), "Grade", font=_font(28), fill="white", anchor="mm")
+    draw.text((width // 2, 300), card["grade"], font=_font(120), fill="white", anchor="mm")
+    draw.text(
+        (width // 2, 375),
+        f"{card['percentage']}%   ·   {card['total']}/{card['max_total']} marks",
+        font=_font(26), fill="white", anchor="mm"
+    )
+
+    # Subject breakdown
+    draw.text((60, 450), "Subject Breakdown", font=_font(30), fill="white")
+    y = 505
+    row_height = min(60, (height - y - 40) // max(len(card["subjects"]), 1))
+    for name, marks, max_marks in card["subjects"]:
+        draw.rounded_rectangle([60, y, width - 60, y + row_height - 10], radius=10, outline=ACCENT, width=2)
+        middle = y + (row_height - 10) // 2
+        draw.text((80, middle), str(name), font=_font(24), fill="white", anchor="lm")
+        draw.text(
+            (width - 80, middle),
+            f"{marks}/{max_marks} ({round(marks / max_marks * 100)}%)",
+            font=_font(24), fill=LIGHT_ACCENT, anchor="rm"
+        )
+        y += row_height
+
+    buffer = BytesIO()
+    image_format, options = CARD_FORMATS[fmt]
+    image.save(buffer, format=image_format, **options)
+    return buffer.getvalue()
+
+def card_filename(index, card, fmt):
+    safe_name = re.sub(r"[^A-Za-z0-9]+", "_", card["name"]).strip("_") or "student"
+    return f"{index + 1:05d}_{safe_name}.{fmt}"
+
+def _render_entry(job):
+    index, card, fmt = job
+    return card_filename(index, card, fmt), render_card(card, fmt)
+
+def write_cards_zip(cards, fileobj, fmt="png", workers=None, chunksize=16):
+    """Render every card and write each one into a ZIP on `fileobj` as soon as it is ready.
+
+    With more than one worker the cards are drawn in a spawn-based process
+    pool, which is safe to start from Streamlit's threaded server. PNG and PDF
+    are already compressed, so entries are stored rather than deflated.
+    """
+    workers = workers or os.cpu_count() or 1
+    jobs = ((index, card, fmt) for index, card in enumerate(cards))
+    with zipfile.ZipFile(fileobj, "w", compression=zipfile.ZIP_STORED) as archive:
+        if workers == 1:
+            for name, data in map(_render_entry, jobs):
+                archive.writestr(name, data)
+        else:
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+                for name, data in pool.map(_render_entry, jobs, chunksize=chunksize):
+                    archive.writestr(name, data)
+    return fileobj
+
+def cards_zip_file(cards, fmt="png", workers=None):
+    """Return an anonymous temp file holding the ZIP, rewound for reading."""
+    fileobj = tempfile.TemporaryFile()
+    write_cards_zip(cards, fileobj, fmt, workers)
+    fileobj.seek(0)
+    return fileobj
+
+def sample_cards(count):
+    subjects = ["Mathematics", "Physics", "Chemistry", "English", "Urdu", "Biology"]
+    cards = []
+    for i in range(count):
+        marks = [60 + (i * 7 + j * 13) % 91 for j in range(len(subjects))]
+        total = sum(marks)
+        max_total = 150 * len(subjects)
+        percentage = round(total / max_total * 100)
+        cards.append({
+            "name": f"Student {i + 1}",
+            "grade": "A" if percentage >= 81 else "B" if percentage >= 71 else "C",
+            "percentage": percentage,
+            "total": total,
+            "max_total": max_total,
+            "subjects": [(name, mark, 150) for name, mark in zip(subjects, marks)]
+        })
+    return cards
+
+def benchmark(count, fmt, worker_counts):
+    cards = sample_cards(count)
+    print(f"{count} {fmt.upper()} cards")
+    print(f"{'workers':>8} {'seconds':>9} {'cards/s':>9}")
+    for workers in worker_counts:
+        started = time.perf_counter()
+        with tempfile.TemporaryFile() as fileobj:
+            write_cards_zip(cards, fileobj, fmt, workers)
+        elapsed = time.perf_counter() - started
+        print(f"{workers:>8} {elapsed:>9.2f} {count / elapsed:>9.1f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark result card rendering")
+    parser.add_argument("--cards", type=int, default=1000)
+    parser.add_argument("--format", choices=list(CARD_FORMATS), default="png")
+    parser.add_argument("--workers", type=int, nargs="*")
+    args = parser.parse_args()
+
+    cpus = os.cpu_count() or 1
+    default_counts = sorted({1, 2, 4, 8, cpus} & set(range(1, cpus + 1))) or [1]
+    benchmark(args.cards, args.format, args.workers or default_counts)
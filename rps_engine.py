@@ -0,0 +1,178 @@
+"""Rock Paper Scissors rules and a headless simulation engine.
+
+RPS_game.py imports the rules and the adaptive opponent's model from here.
+The simulator plays whole move sequences as NumPy arrays of move indices and
+scores them with one lookup into a precomputed outcome matrix, so strategies
+can be compared over millions of rounds without Streamlit.
+
+Run it directly to simulate one matchup, or every matchup across a process pool:
+
+    python rps_engine.py --rounds 10000000 --player biased --computer beat_last
+    python rps_engine.py --sweep --rounds 1000000
+"""
+import argparse
+import itertools
+import multiprocessing
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+MOVES = ["rock", "paper", "scissors"]
+# Move -> the move that beats it
+COUNTERS = {"rock": "paper", "paper": "scissors", "scissors": "rock"}
+# Outcomes from the player's side, in outcome-matrix column order
+RESULTS = ["player", "tie", "computer"]
+BIASED_WEIGHTS = [0.5, 0.3, 0.2]
+
+# Determine the winner
+def determine_winner(player, computer):
+    if player == computer:
+        return "tie"
+    elif (player == "rock" and computer == "scissors") or \
+         (player == "paper" and computer == "rock") or \
+         (player == "scissors" and computer == "paper"):
+        return "player"
+    else:
+        return "computer"
+
+# OUTCOMES[player move, computer move] -> index into RESULTS, built from the rules above
+OUTCOMES = np.array(
+    [[RESULTS.index(determine_winner(player, computer)) for computer in MOVES] for player in MOVES],
+    dtype=np.intp
+)
+
+# Adaptive opponent: an order-k Markov model of the player's moves.
+# The last k moves are packed into a base-3 integer, so the table has a
+# fixed 3**k rows and each round touches one counter.
+def new_markov_model(order):
+    return {"order": order, "counts": [[0, 0, 0] for _ in range(3 ** order)], "context": 0, "seen": 0}
+
+def predict_move(model, rng=random):
+    """The player's most likely next move given their last k moves, or None while learning."""
+    if model["seen"] < model["order"]:
+        return None
+    row = model["counts"][model["context"]]
+    best = max(row)
+    if best == 0:
+        return None
+    return MOVES[rng.choice([i for i, count in enumerate(row) if count == best])]
+
+def update_markov_model(model, move):
+    index = MOVES.index(move)
+    if model["seen"] >= model["order"]:
+        model["counts"][model["context"]][index] += 1
+    model["context"] = (model["context"] * 3 + index) % len(model["counts"])
+    model["seen"] += 1
+
+# Strategies return an array of move indices (0 rock, 1 paper, 2 scissors).
+# Player strategies are fixed in advance; computer strategies may react to
+# the player's earlier moves, which they receive as `player`.
+def random_moves(rng, rounds, player=None):
+    return rng.integers(0, 3, rounds, dtype=np.intp)
+
+def biased_moves(rng, rounds, player=None):
+    return rng.choice(3, rounds, p=BIASED_WEIGHTS)
+
+def cycle_moves(rng, rounds, player=None):
+    return np.arange(rounds, dtype=np.intp) % 3
+
+def rock_moves(rng, rounds, player=None):
+    return np.zeros(rounds, dtype=np.intp)
+
+def copy_last_moves(rng, rounds, player):
+    moves = np.empty(rounds, dtype=np.intp)
+    moves[0] = rng.integers(0, 3)
+    moves[1:] = player[:-1]
+    return moves
+
+def beat_last_moves(rng, rounds, player):
+    # In move-index order, (m + 1) % 3 beats m
+    moves = copy_last_moves(rng, rounds, player)
+    moves[1:] = (moves[1:] + 1) % 3
+    return moves
+
+def adaptive_moves(rng, rounds, player, order=2):
+    """The game's adaptive opponent. Each prediction depends on the last, so this one runs round by round."""
+    choices = random.Random(int(rng.integers(2 ** 32)))
+    counters = [MOVES.index(COUNTERS[move]) for move in MOVES]
+    model = new_markov_model(order)
+    moves = np.empty(rounds, dtype=np.intp)
+    for i, move in enumerate(player.tolist()):
+        predicted = predict_move(model, choices)
+        moves[i] = counters[MOVES.index(predicted)] if predicted is not None else choices.randrange(3)
+        update_markov_model(model, MOVES[move])
+    return moves
+
+PLAYER_STRATEGIES = {
+    "random": random_moves,
+    "biased": biased_moves,
+    "cycle": cycle_moves,
+    "rock": rock_moves
+}
+COMPUTER_STRATEGIES = {
+    "random": random_moves,
+    "copy_last": copy_last_moves,
+    "beat_last": beat_last_moves,
+    "adaptive": adaptive_moves
+}
+
+def score(player, computer):
+    """Counts of each result in RESULTS for two equal-length move arrays."""
+    return np.bincount(OUTCOMES[player, computer], minlength=len(RESULTS))
+
+def simulate(player_strategy, computer_strategy, rounds, seed=None):
+    """Play `rounds` rounds and return win/tie/loss rates from the player's side."""
+    rng = np.random.default_rng(seed)
+    player = PLAYER_STRATEGIES[player_strategy](rng, rounds)
+    computer = COMPUTER_STRATEGIES[computer_strategy](rng, rounds, player)
+    counts = score(player, computer)
+    return {
+        "player": player_strategy,
+        "computer": computer_strategy,
+        "rounds": rounds,
+        "win": counts[0] / rounds,
+        "tie": counts[1] / rounds,
+        "loss": counts[2] / rounds
+    }
+
+def _simulate_entry(job):
+    return simulate(*job)
+
+def sweep(matchups, rounds, workers=None, seed=None):
+    """Simulate every (player, computer) matchup, across a spawn-based process pool when workers > 1."""
+    workers = workers or os.cpu_count() or 1
+    seeds = np.random.SeedSequence(seed).spawn(len(matchups))
+    jobs = [(player, computer, rounds, child) for (player, computer), child in zip(matchups, seeds)]
+    if workers == 1:
+        return list(map(_simulate_entry, jobs))
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        return list(pool.map(_simulate_entry, jobs))
+
+def print_results(results):
+    print(f"{'player':>8} {'computer':>10} {'rounds':>11} {'win':>7} {'tie':>7} {'loss':>7}")
+    for r in results:
+        print(f"{r['player']:>8} {r['computer']:>10} {r['rounds']:>11,} {r['win']:>7.2%} {r['tie']:>7.2%} {r['loss']:>7.2%}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulate Rock Paper Scissors strategies")
+    parser.add_argument("--rounds", type=int, default=10_000_000)
+    parser.add_argument("--player", choices=list(PLAYER_STRATEGIES), default="random")
+    parser.add_argument("--computer", choices=list(COMPUTER_STRATEGIES), default="random",
+                        help="adaptive plays round by round and is far slower than the others")
+    parser.add_argument("--sweep", action="store_true", help="simulate every player/computer matchup")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    if args.sweep:
+        results = sweep(list(itertools.product(PLAYER_STRATEGIES, COMPUTER_STRATEGIES)), args.rounds, args.workers, args.seed)
+    else:
+        results = [simulate(args.player, args.computer, args.rounds, args.seed)]
+    elapsed = time.perf_counter() - started
+    print_results(results)
+    print(f"{sum(r['rounds'] for r in results):,} rounds in {elapsed:.2f}s")
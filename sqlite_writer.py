@@ -0,0 +1,51 @@
+"""Batched background inserts into SQLite, shared by quiz_game.py and calculator.py.
+
+Rows are queued from the script thread and written by one daemon thread,
+which drains everything queued so far into a single transaction. Queued rows
+are flushed when the writer is closed, which also happens at interpreter exit.
+"""
+import atexit
+import queue
+import sqlite3
+import threading
+
+
+class BatchWriter:
+    """Runs `insert` with executemany for each batch of queued rows."""
+
+    def __init__(self, path, insert):
+        self.path = path
+        self.insert = insert
+        self.pending = queue.Queue()
+        self.thread = threading.Thread(target=self._write_loop, daemon=True)
+        self.thread.start()
+        atexit.register(self.close)
+
+    def put(self, rows):
+        """Queue a list of parameter tuples for `insert`."""
+        if rows:
+            self.pending.put(rows)
+
+    def close(self):
+        """Flush queued rows and stop the writer; safe to call more than once."""
+        if self.thread.is_alive():
+            self.pending.put(None)
+            self.thread.join(timeout=10)
+
+    def _write_loop(self):
+        conn = sqlite3.connect(self.path)
+        running = True
+        while running:
+            batch = [self.pending.get()]
+            # Drain whatever else queued up so bursts become one transaction
+            while True:
+                try:
+                    batch.append(self.pending.get_nowait())
+                except queue.Empty:
+                    break
+            running = None not in batch
+            rows = [row for rows in batch if rows is not None for row in rows]
+            if rows:
+                with conn:
+                    conn.executemany(self.insert, rows)
+        conn.close()
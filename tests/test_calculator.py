@@ -0,0 +1,26 @@
+from pathlib import Path
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+APP = str(Path(__file__).resolve().parent.parent / "calculator.py")
+
+
+def expression_result(expression):
+    at = AppTest.from_file(APP, default_timeout=30)
+    at.run()
+    at.sidebar.radio[0].set_value("⌨️ Expression").run()
+    at.text_input(key="expression").input(expression).run()
+    assert not at.exception
+    return next(m.value for m in at.markdown if "<div class='result-box'>" in m.value)
+
+
+@pytest.mark.parametrize("expression, head, tail", [
+    ("2**20000", "39802768403379665923", "63406309376"),
+    ("10**5000", "10000000000", "00000000000"),
+])
+def test_expression_shows_int_over_str_limit(expression, head, tail):
+    # Python refuses str() on ints over 4,300 digits; the second run is recalled from history
+    for _ in range(2):
+        box = expression_result(expression)
+        assert head in box and f"{tail}</b>" in box and "…" in box